@@ -0,0 +1,252 @@
+import json
+import time
+import asyncio
+import logging
+from urllib.parse import quote_plus
+
+import aiohttp
+
+from ChannelFetcher import (
+    DEFAULT_HEADERS, extract_initial_data, extract_ytcfg, extract_search_channels,
+    extract_continuation, extract_about_data
+)
+from QueryScheduler import QueryScheduler
+from Metrics import observe, record_error
+from RateLimit import get_throttle, is_throttled
+from TGPars import TelegramParser
+from LinkValidator import (
+    TELEGRAM_URL, KIND_DEAD, ValidationCache, handle_from_url, classify_preview
+)
+
+logger = logging.getLogger(__name__)
+
+YOUTUBE_URL = "https://www.youtube.com"
+SEARCH_FILTER_CHANNELS = "EgIQAg%3D%3D"
+
+
+class AsyncPipeline:
+    """asyncio-конвейер для этапов, которым хватает обычного HTTP.
+
+    Поиск по выдаче (с продолжением через continuation), загрузка страниц каналов
+    и проверка t.me ссылок идут сотнями параллельных запросов в одном потоке.
+    Результаты отдаются в тот же result_callback(youtube_url, telegram_url),
+    что и у YouTubeSearcher.
+    """
+
+    def __init__(self, result_callback=None, channel_filter=None, max_connections=200,
+                 per_host_limit=50, channel_concurrency=100, timeout=15, validate_links=False,
+                 base_url=YOUTUBE_URL, max_pages=50, validation_cache=None,
+                 telegram_url=TELEGRAM_URL, positions=None):
+        self.result_callback = result_callback
+        # Синхронный фильтр новых каналов (например, YouTubeSearcher._register_channels)
+        self.channel_filter = channel_filter
+        self.max_connections = max_connections
+        self.per_host_limit = per_host_limit
+        self.channel_concurrency = channel_concurrency
+        self.timeout = timeout
+        self.validate_links = validate_links
+        self.base_url = base_url.rstrip('/')
+        self.max_pages = max_pages
+        self.parser = TelegramParser()
+        # Общий с TelegramValidator кэш: популярные имена проверяются один раз
+        self.validation_cache = validation_cache or ValidationCache()
+        self.telegram_url = telegram_url.rstrip('/')
+        # Незавершенные прогоны выдачи: запрос -> {continuation, config}. Общий словарь
+        # с YouTubeSearcher попадает в контрольную точку, с него же продолжается поиск
+        self.positions = positions if positions is not None else {}
+
+        self.stats = {
+            "search_pages": 0,
+            "channels_fetched": 0,
+            "links_found": 0,
+            "links_invalid": 0,
+            "errors": 0
+        }
+
+    def run(self, queries, stop_event, scheduler=None, initial_channels=()):
+        """Блокирующий запуск конвейера до установки stop_event"""
+        asyncio.run(self.run_async(queries, stop_event, scheduler, initial_channels))
+
+    async def run_async(self, queries, stop_event, scheduler=None, initial_channels=()):
+        connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.per_host_limit)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        cookies = {"CONSENT": "YES+1", "SOCS": "CAI"}
+        scheduler = scheduler or QueryScheduler(queries)
+        channel_queue = asyncio.Queue(maxsize=self.channel_concurrency * 10)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         headers=DEFAULT_HEADERS, cookies=cookies) as session:
+            searchers = [
+                asyncio.create_task(self._search_loop(session, scheduler, channel_queue, stop_event))
+                for _ in range(len(scheduler))
+            ]
+            channel_workers = [
+                asyncio.create_task(self._channel_loop(session, channel_queue, stop_event))
+                for _ in range(self.channel_concurrency)
+            ]
+            if initial_channels:
+                searchers.append(asyncio.create_task(self._feed_channels(channel_queue, initial_channels)))
+
+            while not stop_event.is_set():
+                await asyncio.sleep(0.5)
+
+            for task in searchers + channel_workers:
+                task.cancel()
+            await asyncio.gather(*searchers, *channel_workers, return_exceptions=True)
+
+        logger.info(f"Async конвейер остановлен: {self.stats}")
+
+    async def _search_loop(self, session, scheduler, channel_queue, stop_event):
+        """Этап поиска: прогон запросов планировщика по всем страницам выдачи"""
+        while not stop_event.is_set():
+            query, wait = scheduler.acquire_nowait()
+            if query is None:
+                await asyncio.sleep(min(max(wait, 0.05), 1.0))
+                continue
+
+            new_count = 0
+            try:
+                async for channel_links in self._iter_search_pages(session, query, stop_event):
+                    new_channels = await self._filter_channels(channel_links)
+                    new_count += len(new_channels)
+                    for channel_url in new_channels:
+                        await channel_queue.put(channel_url)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                record_error(e, "search")
+                logger.error(f"Ошибка async поиска по '{query}': {str(e)}")
+            finally:
+                scheduler.release(query, new_count)
+
+    async def _feed_channels(self, channel_queue, channel_urls):
+        """Каналы из контрольной точки - в очередь обработки"""
+        for channel_url in channel_urls:
+            await channel_queue.put(channel_url)
+
+    async def _iter_search_pages(self, session, query, stop_event):
+        """Страницы выдачи: первая HTML, дальше POST youtubei/v1/search с continuation.
+
+        Прерванный прогон продолжается с сохраненного continuation без загрузки первых страниц.
+        """
+        position = self.positions.get(query)
+        if position:
+            config = position["config"]
+            data = await self._fetch_continuation(session, config, position["continuation"])
+        else:
+            url = f"{self.base_url}/results?search_query={quote_plus(query)}&sp={SEARCH_FILTER_CHANNELS}"
+            html = await self._get_text(session, url)
+            data = extract_initial_data(html)
+            if data is None:
+                raise ValueError("ytInitialData не найден на странице выдачи")
+            config = extract_ytcfg(html)
+
+        seen = set()
+        for _ in range(self.max_pages):
+            self.stats["search_pages"] += 1
+            new_links = [url for url in extract_search_channels(data, self.base_url) if url not in seen]
+            seen.update(new_links)
+            if not new_links:
+                break
+            yield new_links
+
+            token = extract_continuation(data)
+            if stop_event.is_set():
+                # Позиция остается для продолжения после перезапуска
+                return
+            if not token or "INNERTUBE_API_KEY" not in config:
+                break
+            self.positions[query] = {
+                "continuation": token,
+                "config": {key: config[key] for key in ("INNERTUBE_API_KEY", "INNERTUBE_CONTEXT") if key in config}
+            }
+            data = await self._fetch_continuation(session, config, token)
+
+        self.positions.pop(query, None)
+
+    async def _fetch_continuation(self, session, config, token):
+        return await self._post_json(
+            session,
+            f"{self.base_url}/youtubei/v1/search?key={config['INNERTUBE_API_KEY']}",
+            {"context": config.get("INNERTUBE_CONTEXT", {}), "continuation": token}
+        )
+
+    async def _filter_channels(self, channel_links):
+        if not self.channel_filter:
+            return channel_links
+        # Фильтр может ходить в SQLite - не блокируем цикл событий
+        return await asyncio.to_thread(self.channel_filter, channel_links)
+
+    async def _channel_loop(self, session, channel_queue, stop_event):
+        """Этап каналов: загрузка /about, извлечение и (опционально) проверка ссылки"""
+        while not stop_event.is_set():
+            channel_url = await channel_queue.get()
+            try:
+                telegram_url = await self._process_channel(session, channel_url)
+                if telegram_url and self.validate_links:
+                    telegram_url = await self._validate_link(session, telegram_url)
+                if self.result_callback:
+                    # Канал, дообработанный после остановки, тоже доходит до результатов.
+                    # Колбэк пишет в индекс каналов (SQLite) - не блокируем цикл событий
+                    await asyncio.to_thread(self.result_callback, channel_url, telegram_url)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                record_error(e, "channel")
+                logger.error(f"Ошибка async обработки канала {channel_url}: {str(e)}")
+            finally:
+                channel_queue.task_done()
+
+    async def _process_channel(self, session, channel_url):
+        html = await self._get_text(session, channel_url.rstrip('/') + '/about')
+        self.stats["channels_fetched"] += 1
+        about = extract_about_data(html)
+        if about is None:
+            raise ValueError("ytInitialData не найден на странице канала")
+
+        telegram_url = self.parser.find_link_in_about(about)
+        if telegram_url:
+            self.stats["links_found"] += 1
+        logger.info(f"Обработан канал: {channel_url} -> {telegram_url or 'Not found'}")
+        return telegram_url
+
+    async def _validate_link(self, session, telegram_url):
+        """Проверка t.me ссылки по странице предпросмотра; несуществующие отбрасываются"""
+        handle = handle_from_url(telegram_url)
+        kind = await asyncio.to_thread(self.validation_cache.get, handle) if handle else KIND_DEAD
+        if kind is None:
+            try:
+                html = await self._get_text(session, f"{self.telegram_url}/{handle}")
+                kind = classify_preview(html, handle)
+            except aiohttp.ClientResponseError as e:
+                if e.status != 404:
+                    raise
+                kind = KIND_DEAD
+            await asyncio.to_thread(self.validation_cache.put, handle, kind)
+
+        if kind != KIND_DEAD:
+            logger.info(f"Telegram ссылка {telegram_url}: {kind}")
+            return telegram_url
+        self.stats["links_invalid"] += 1
+        logger.info(f"Telegram ссылка не существует: {telegram_url}")
+        return None
+
+    async def _get_text(self, session, url):
+        started = time.monotonic()
+        async with get_throttle(url).request_async() as outcome, session.get(url) as response:
+            outcome.throttled = is_throttled(response.status, str(response.url))
+            response.raise_for_status()
+            text = await response.text()
+        elapsed = time.monotonic() - started
+        observe("page_load.async", elapsed)
+        logger.debug(f"GET {url}: {elapsed:.2f} с")
+        return text
+
+    async def _post_json(self, session, url, payload):
+        async with get_throttle(url).request_async() as outcome, session.post(
+                url, data=json.dumps(payload), headers={"Content-Type": "application/json"}) as response:
+            outcome.throttled = is_throttled(response.status, str(response.url))
+            response.raise_for_status()
+            return await response.json(content_type=None)
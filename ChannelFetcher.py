@@ -0,0 +1,226 @@
+import json
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse, parse_qs, unquote
+from RateLimit import get_throttle, is_throttled
+from Tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Маркеры, после которых на странице канала лежит JSON ytInitialData
+INITIAL_DATA_MARKERS = (
+    'var ytInitialData = ',
+    'window["ytInitialData"] = ',
+    "window['ytInitialData'] = ",
+    'ytInitialData = '
+)
+
+# Блоки внешних ссылок "О канале": новый channelExternalLinkViewModel и
+# primaryLinks/secondaryLinks старого channelAboutFullMetadataRenderer
+LINK_RENDERER_KEYS = ("channelExternalLinkViewModel", "primaryLinks", "secondaryLinks")
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "ru-RU,ru;q=0.9,en;q=0.8",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive"
+}
+
+
+def extract_initial_data(html):
+    """Извлечение JSON ytInitialData из HTML страницы"""
+    decoder = json.JSONDecoder()
+    for marker in INITIAL_DATA_MARKERS:
+        start = html.find(marker)
+        if start == -1:
+            continue
+        start = html.find('{', start + len(marker))
+        if start == -1:
+            continue
+        try:
+            data, _ = decoder.raw_decode(html, start)
+            return data
+        except ValueError as e:
+            logger.debug(f"Ошибка разбора ytInitialData: {str(e)}")
+    return None
+
+
+def extract_ytcfg(html):
+    """Настройки страницы из вызовов ytcfg.set({...}): ключ и контекст InnerTube API"""
+    decoder = json.JSONDecoder()
+    config = {}
+    start = html.find('ytcfg.set({')
+    while start != -1:
+        try:
+            data, _ = decoder.raw_decode(html, start + len('ytcfg.set('))
+            config.update(data)
+        except ValueError:
+            pass
+        start = html.find('ytcfg.set({', start + 1)
+    return config
+
+
+def extract_search_channels(data, base_url="https://www.youtube.com"):
+    """URL каналов из блоков channelRenderer выдачи поиска (страница или continuation)"""
+    channels = []
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            renderer = node.get("channelRenderer")
+            if isinstance(renderer, dict):
+                url = _channel_url_from_renderer(renderer, base_url)
+                if url and url not in channels:
+                    channels.append(url)
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+    return channels
+
+
+def _channel_url_from_renderer(renderer, base_url):
+    browse = renderer.get("navigationEndpoint", {}).get("browseEndpoint", {})
+    canonical_url = browse.get("canonicalBaseUrl")
+    if canonical_url:
+        return f"{base_url}{canonical_url}"
+    channel_id = renderer.get("channelId") or browse.get("browseId")
+    if channel_id:
+        return f"{base_url}/channel/{channel_id}"
+    return None
+
+
+def extract_continuation(data):
+    """Токен следующей страницы выдачи или None, если выдача закончилась"""
+    token = None
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            command = node.get("continuationCommand")
+            if isinstance(command, dict) and command.get("token"):
+                token = command["token"]
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return token
+
+
+def decode_redirect(url):
+    """Раскрытие ссылок вида youtube.com/redirect?q=..."""
+    if '/redirect' not in url:
+        return url
+    params = parse_qs(urlparse(url).query)
+    if 'q' in params:
+        return unquote(params['q'][0])
+    return url
+
+
+def _collect_renderer_links(node, links):
+    """Ссылки одного блока внешних ссылок: адреса urlEndpoint и текст ссылки link.content"""
+    if isinstance(node, dict):
+        endpoint = node.get("urlEndpoint")
+        if isinstance(endpoint, dict) and isinstance(endpoint.get("url"), str):
+            links.append(endpoint["url"])
+        for value in node.values():
+            _collect_renderer_links(value, links)
+        link = node.get("link")
+        if isinstance(link, dict) and isinstance(link.get("content"), str):
+            links.append(link["content"])
+    elif isinstance(node, list):
+        for item in node:
+            _collect_renderer_links(item, links)
+
+
+def _walk(node, description_parts, links):
+    """Рекурсивный обход ytInitialData: описания отовсюду, ссылки - только из блоков ссылок.
+
+    Строки под "content"/"url" вне этих блоков - текст и служебные адреса страницы, а не ссылки.
+    """
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key in LINK_RENDERER_KEYS:
+                _collect_renderer_links(value, links)
+            elif isinstance(value, str):
+                if key == "description":
+                    description_parts.append(value)
+            elif key == "description" and isinstance(value, dict):
+                # {"simpleText": ...} или {"content": ...}
+                text = value.get("simpleText") or value.get("content")
+                if isinstance(text, str):
+                    description_parts.append(text)
+                _walk(value, description_parts, links)
+            else:
+                _walk(value, description_parts, links)
+    elif isinstance(node, list):
+        for item in node:
+            _walk(item, description_parts, links)
+
+
+def extract_about_data(html):
+    """Описание канала и внешние ссылки из HTML страницы канала.
+
+    Возвращает None, если ytInitialData не удалось найти или разобрать.
+    """
+    data = extract_initial_data(html)
+    if data is None:
+        return None
+
+    description_parts = []
+    raw_links = []
+    _walk(data, description_parts, raw_links)
+
+    links = []
+    seen = set()
+    for link in raw_links:
+        decoded = decode_redirect(link)
+        if decoded not in seen:
+            seen.add(decoded)
+            links.append(decoded)
+
+    return {
+        "description": "\n".join(dict.fromkeys(description_parts)),
+        "links": links
+    }
+
+
+class ChannelPageFetcher:
+    """Загрузка страниц каналов по HTTP без браузера"""
+
+    def __init__(self, pool_size=10, timeout=15):
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=1)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(DEFAULT_HEADERS)
+        # Без согласия на cookies YouTube отдает страницу consent.youtube.com
+        self.session.cookies.set("CONSENT", "YES+1", domain=".youtube.com")
+        self.session.cookies.set("SOCS", "CAI", domain=".youtube.com")
+
+    def fetch(self, url):
+        """Загрузка HTML страницы (в пределах общего ограничения частоты запросов к хосту)"""
+        with get_throttle(url).request() as outcome, span("navigate.http", url=url):
+            response = self.session.get(url, timeout=self.timeout)
+            outcome.throttled = is_throttled(response.status_code, response.url)
+            response.raise_for_status()
+            if "consent." in urlparse(response.url).netloc:
+                raise requests.exceptions.RequestException("YouTube запросил согласие на cookies")
+            return response.text
+
+    def fetch_about(self, channel_url):
+        """Данные блока "О канале" или None, если разобрать страницу не удалось"""
+        about_url = channel_url.rstrip('/') + '/about'
+        try:
+            html = self.fetch(about_url)
+        except requests.exceptions.RequestException as e:
+            logger.debug(f"Ошибка загрузки {about_url}: {str(e)}")
+            return None
+        return extract_about_data(html)
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,196 @@
+import os
+import glob
+import json
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Через сколько перепроверять каналы без Telegram ссылки
+DEFAULT_NOT_FOUND_TTL = 7 * 24 * 3600
+# Предел размера индекса: сверх него удаляются каналы, которые дольше всех не встречались
+DEFAULT_MAX_CHANNELS = 1000000
+# Как часто (в записанных каналах) проверять предел и удалять устаревшие "Not found"
+PRUNE_EVERY = 1000
+
+
+class ChannelStore:
+    """Постоянный индекс обработанных каналов: URL -> последний результат и время проверки.
+
+    Размер ограничен max_channels по принципу LRU: seen_at обновляется при записи и
+    при каждом отсеве канала в filter_new. "Not found" старше not_found_ttl удаляются.
+    """
+
+    def __init__(self, db_path, not_found_ttl=DEFAULT_NOT_FOUND_TTL, max_channels=DEFAULT_MAX_CHANNELS):
+        self.db_path = db_path
+        self.not_found_ttl = not_found_ttl
+        self.max_channels = max_channels
+        self._lock = threading.Lock()
+        self._recorded_since_prune = 0
+
+        is_new = not os.path.exists(db_path)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS channels ("
+            "url TEXT PRIMARY KEY, "
+            "telegram_url TEXT, "
+            "checked_at REAL NOT NULL, "
+            "seen_at REAL)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(channels)")}
+        if "seen_at" not in columns:
+            # Индекс из прошлых версий: время последнего использования = время проверки
+            self._conn.execute("ALTER TABLE channels ADD COLUMN seen_at REAL")
+            self._conn.execute("UPDATE channels SET seen_at = checked_at")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS channels_seen_at ON channels (seen_at)")
+        self._conn.commit()
+        self.is_new = is_new
+        self.prune()
+
+        logger.info(f"Индекс каналов: {db_path} ({self.count()} записей)")
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM channels").fetchone()[0]
+
+    def filter_new(self, urls):
+        """Каналы, которые еще не проверялись или чей "Not found" устарел"""
+        urls = list(urls)
+        if not urls:
+            return []
+
+        now = time.time()
+        expired_before = now - self.not_found_ttl
+        known = set()
+        with self._lock:
+            # Ограничение SQLite на число параметров в одном запросе
+            for i in range(0, len(urls), 500):
+                chunk = urls[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT url FROM channels WHERE url IN ({placeholders}) "
+                    f"AND (telegram_url IS NOT NULL OR checked_at >= ?)",
+                    (*chunk, expired_before)
+                ).fetchall()
+                known.update(row[0] for row in rows)
+            if known:
+                # Отсеянные каналы снова встретились - не кандидаты на вытеснение
+                self._conn.executemany(
+                    "UPDATE channels SET seen_at = ? WHERE url = ?",
+                    [(now, url) for url in known]
+                )
+                self._conn.commit()
+
+        return [url for url in urls if url not in known]
+
+    def get(self, url):
+        """Последний результат по каналу: (telegram_url, checked_at) или None"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT telegram_url, checked_at FROM channels WHERE url = ?", (url,)
+            ).fetchone()
+
+    def record(self, url, telegram_url, checked_at=None):
+        """Сохранение результата проверки канала"""
+        self.record_many([(url, telegram_url, checked_at)])
+
+    def record_many(self, rows):
+        now = time.time()
+        rows = [(url, telegram_url or None, checked_at or now, checked_at or now)
+                for url, telegram_url, checked_at in rows]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO channels (url, telegram_url, checked_at, seen_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+            self._recorded_since_prune += len(rows)
+            due = self._recorded_since_prune >= PRUNE_EVERY
+        if due:
+            self.prune()
+
+    def prune(self):
+        """Удаление устаревших "Not found" и вытеснение давно не встречавшихся каналов сверх max_channels"""
+        with self._lock:
+            self._recorded_since_prune = 0
+            expired = self._conn.execute(
+                "DELETE FROM channels WHERE telegram_url IS NULL AND checked_at < ?",
+                (time.time() - self.not_found_ttl,)
+            ).rowcount
+            evicted = 0
+            if self.max_channels:
+                excess = self._conn.execute("SELECT COUNT(*) FROM channels").fetchone()[0] - self.max_channels
+                if excess > 0:
+                    evicted = self._conn.execute(
+                        "DELETE FROM channels WHERE url IN "
+                        "(SELECT url FROM channels ORDER BY seen_at LIMIT ?)",
+                        (excess,)
+                    ).rowcount
+            self._conn.commit()
+
+        if expired or evicted:
+            logger.info(f"Индекс каналов: удалено устаревших Not found {expired}, вытеснено {evicted}")
+        return expired + evicted
+
+    def import_results(self, results_dir):
+        """Заполнение индекса из results/*.xlsx и журналов results/*.jsonl"""
+        imported = 0
+        for path in sorted(glob.glob(os.path.join(results_dir, "*.xlsx"))):
+            imported += self._import_rows(path, self._read_xlsx(path))
+        for path in sorted(glob.glob(os.path.join(results_dir, "*.jsonl"))):
+            imported += self._import_rows(path, self._read_jsonl(path))
+        logger.info(f"Импортировано в индекс каналов: {imported} записей")
+        return imported
+
+    def _import_rows(self, path, rows):
+        try:
+            batch = []
+            for row in rows:
+                if not row or not row[0]:
+                    continue
+                telegram_url = row[1] if len(row) > 1 and row[1] != "Not found" else None
+                batch.append((row[0], telegram_url, self._parse_timestamp(row)))
+            self.record_many(batch)
+            return len(batch)
+        except Exception as e:
+            logger.error(f"Ошибка импорта {path}: {str(e)}")
+            return 0
+
+    @staticmethod
+    def _read_xlsx(path):
+        from openpyxl import load_workbook
+
+        wb = load_workbook(path, read_only=True)
+        try:
+            rows = wb.active.iter_rows(min_row=2, values_only=True)
+            return [list(row) for row in rows]
+        finally:
+            wb.close()
+
+    @staticmethod
+    def _read_jsonl(path):
+        rows = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    continue
+        return rows
+
+    @staticmethod
+    def _parse_timestamp(row):
+        """Время из колонок "Дата" и "Время", если они есть"""
+        try:
+            return datetime.strptime(f"{row[2]} {row[3]}", '%Y-%m-%d %H:%M:%S').timestamp()
+        except (IndexError, TypeError, ValueError):
+            return None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
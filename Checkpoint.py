@@ -0,0 +1,76 @@
+import os
+import gzip
+import json
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_VERSION = 1
+DEFAULT_CHECKPOINT_INTERVAL = 30.0
+
+
+def save_checkpoint(path, state):
+    """Запись состояния в gzip JSON через временный файл и атомарную замену"""
+    state = dict(state, version=CHECKPOINT_VERSION, saved_at=time.time())
+    tmp_path = path + ".tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path):
+    """Состояние из файла контрольной точки или None, если файла нет или он поврежден"""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.error(f"Не удалось прочитать контрольную точку {path}: {str(e)}")
+        return None
+    if state.get("version") != CHECKPOINT_VERSION:
+        logger.warning(f"Контрольная точка {path} другой версии, пропускаем")
+        return None
+    return state
+
+
+class Checkpointer:
+    """Периодическое сохранение состояния поиска; последнее сохранение - при закрытии"""
+
+    def __init__(self, collect, path, interval=DEFAULT_CHECKPOINT_INTERVAL):
+        self.collect = collect
+        self.path = path
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="Checkpointer", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.save()
+
+    def save(self):
+        try:
+            started = time.monotonic()
+            state = self.collect()
+            save_checkpoint(self.path, state)
+            logger.debug(
+                f"Контрольная точка сохранена: в очереди {len(state.get('pending', []))} каналов, "
+                f"{time.monotonic() - started:.2f} с"
+            )
+        except Exception as e:
+            logger.error(f"Ошибка сохранения контрольной точки: {str(e)}")
+
+    def close(self):
+        """Остановка периодического сохранения и финальная запись"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+        self.save()
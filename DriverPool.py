@@ -0,0 +1,195 @@
+import time
+import queue
+import logging
+import threading
+from contextlib import contextmanager
+from selenium.common.exceptions import WebDriverException, TimeoutException
+from Metrics import observe
+from Tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledDriver:
+    """Драйвер из пула вместе со служебными счетчиками"""
+
+    __slots__ = ("driver", "uses", "created_at", "last_check")
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created_at = time.monotonic()
+        self.last_check = self.created_at
+
+
+class DriverPool:
+    """Пул прогретых ChromeDriver сессий, общий для поиска и парсинга каналов"""
+
+    def __init__(self, driver_factory, size=3, max_uses=50, health_check_interval=30.0):
+        self._factory = driver_factory
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.health_check_interval = health_check_interval
+
+        # LIFO: в работу первым уходит самый "теплый" драйвер
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+        self.stats = {
+            "drivers_created": 0,
+            "drivers_recycled": 0,
+            "drivers_crashed": 0,
+            "leases": 0,
+            "total_wait_time": 0.0,
+            "max_wait_time": 0.0,
+            "total_lease_time": 0.0
+        }
+
+        logger.info(f"Инициализирован пул драйверов на {self.size} сессий")
+
+    def _create(self):
+        """Запуск новой сессии браузера"""
+        started = time.monotonic()
+        with span("driver.create"):
+            driver = self._factory()
+        elapsed = time.monotonic() - started
+        with self._lock:
+            self.stats["drivers_created"] += 1
+        observe("driver_startup", elapsed)
+        logger.info(f"Запущен новый драйвер за {elapsed:.2f} с")
+        return _PooledDriver(driver)
+
+    def _discard(self, entry, reason):
+        """Закрытие сессии и освобождение места в пуле"""
+        with self._lock:
+            self._created -= 1
+            if reason == "crash":
+                self.stats["drivers_crashed"] += 1
+            elif reason == "recycle":
+                self.stats["drivers_recycled"] += 1
+        try:
+            entry.driver.quit()
+        except Exception as e:
+            logger.debug(f"Ошибка закрытия драйвера: {str(e)}")
+
+    def _is_healthy(self, entry):
+        """Проверка, что сессия браузера еще жива"""
+        now = time.monotonic()
+        if now - entry.last_check < self.health_check_interval:
+            return True
+        try:
+            entry.driver.execute_script("return 1")
+            entry.last_check = now
+            return True
+        except Exception as e:
+            logger.warning(f"Драйвер не прошел проверку, пересоздаем: {str(e)}")
+            return False
+
+    def _acquire(self, timeout):
+        """Получение драйвера из пула (или создание нового, если есть место)"""
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+
+        while True:
+            if self._closed:
+                raise RuntimeError("Пул драйверов закрыт")
+
+            try:
+                entry = self._idle.get_nowait()
+            except queue.Empty:
+                entry = None
+
+            if entry is None:
+                with self._lock:
+                    can_create = self._created < self.size
+                    if can_create:
+                        self._created += 1
+
+                if can_create:
+                    try:
+                        entry = self._create()
+                    except Exception:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                else:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("Нет свободных драйверов в пуле")
+                    try:
+                        # Короткий таймаут, чтобы вовремя заметить закрытие пула
+                        entry = self._idle.get(timeout=0.5 if remaining is None else min(remaining, 0.5))
+                    except queue.Empty:
+                        continue
+
+            if not self._is_healthy(entry):
+                self._discard(entry, "crash")
+                continue
+
+            wait_time = time.monotonic() - started
+            with self._lock:
+                self.stats["leases"] += 1
+                self.stats["total_wait_time"] += wait_time
+                self.stats["max_wait_time"] = max(self.stats["max_wait_time"], wait_time)
+            return entry
+
+    def _release(self, entry, broken, lease_time):
+        """Возврат драйвера в пул или его пересоздание"""
+        entry.uses += 1
+        with self._lock:
+            self.stats["total_lease_time"] += lease_time
+
+        if broken:
+            self._discard(entry, "crash")
+        elif self._closed:
+            self._discard(entry, "close")
+        elif self.max_uses and entry.uses >= self.max_uses:
+            logger.debug(f"Драйвер отработал {entry.uses} аренд, пересоздаем")
+            self._discard(entry, "recycle")
+        else:
+            self._idle.put(entry)
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """Аренда драйвера на время блока with"""
+        entry = self._acquire(timeout)
+        leased_at = time.monotonic()
+        broken = False
+        try:
+            yield entry.driver
+        except WebDriverException as e:
+            # Таймаут загрузки страницы - не повод убивать сессию
+            broken = not isinstance(e, TimeoutException)
+            raise
+        finally:
+            self._release(entry, broken, time.monotonic() - leased_at)
+
+    def get_stats(self):
+        """Снимок статистики пула"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["active_drivers"] = self._created
+        leases = stats["leases"] or 1
+        stats["avg_wait_time"] = stats["total_wait_time"] / leases
+        stats["avg_lease_time"] = stats["total_lease_time"] / leases
+        return stats
+
+    def close(self):
+        """Закрытие всех простаивающих драйверов; занятые закроются при возврате"""
+        self._closed = True
+        while True:
+            try:
+                entry = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(entry, "close")
+
+        stats = self.get_stats()
+        logger.info(
+            f"Пул драйверов закрыт: аренд {stats['leases']}, "
+            f"создано {stats['drivers_created']}, "
+            f"среднее ожидание {stats['avg_wait_time']:.2f} с, "
+            f"средняя аренда {stats['avg_lease_time']:.2f} с"
+        )
@@ -0,0 +1,117 @@
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Облегченный профиль: без картинок, медиа, шрифтов и рекламы
+LEAN_ARGUMENTS = [
+    "--blink-settings=imagesEnabled=false",
+    "--disk-cache-size=52428800",
+    "--media-cache-size=1",
+    "--autoplay-policy=user-gesture-required",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-translate",
+    "--metrics-recording-only",
+    "--no-first-run",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication",
+    "--window-size=1280,900"
+]
+
+LEAN_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.managed_default_content_settings.media_stream": 2,
+    "profile.managed_default_content_settings.plugins": 2,
+    "profile.managed_default_content_settings.geolocation": 2,
+    "profile.default_content_setting_values.notifications": 2
+}
+
+# Запросы, которые режутся через CDP Network.setBlockedURLs
+BLOCKED_URL_PATTERNS = [
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.m4a",
+    "*googlevideo.com/*",
+    "*i.ytimg.com/*",
+    "*yt3.ggpht.com/*",
+    "*doubleclick.net/*",
+    "*googlesyndication.com/*",
+    "*googleadservices.com/*",
+    "*google-analytics.com/*",
+    "*youtube.com/api/stats/*",
+    "*youtube.com/pagead/*",
+    "*youtube.com/ptracking*"
+]
+
+# Объем и время загрузки страницы по Resource Timing API
+PAGE_COST_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+let bytes = nav ? nav.transferSize : 0;
+for (const entry of resources) {
+    bytes += entry.transferSize || 0;
+}
+return {
+    bytes: bytes,
+    requests: resources.length + 1,
+    dom_content_loaded: nav ? nav.domContentLoadedEventEnd : 0,
+    load: nav ? nav.loadEventEnd : 0
+};
+"""
+
+
+def apply_lean_profile(chrome_options):
+    """Настройка ChromeOptions под облегченный профиль для парсинга"""
+    for arg in LEAN_ARGUMENTS:
+        chrome_options.add_argument(arg)
+    chrome_options.add_experimental_option("prefs", LEAN_PREFS)
+    # Не ждем картинок и сабресурсов: хватает готового DOM
+    chrome_options.page_load_strategy = "eager"
+    return chrome_options
+
+
+def enable_request_blocking(driver):
+    """Блокировка тяжелых запросов через Chrome DevTools Protocol"""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    except Exception as e:
+        logger.warning(f"Не удалось включить блокировку запросов: {str(e)}")
+
+
+def measure_page_cost(driver, url):
+    """Загрузка страницы с замером времени и переданных байт"""
+    started = time.monotonic()
+    driver.get(url)
+    elapsed = time.monotonic() - started
+    cost = driver.execute_script(PAGE_COST_JS) or {}
+    cost["wall_time"] = elapsed
+    return cost
+
+
+def compare_profiles(driver_factory, url, runs=3):
+    """Сравнение облегченного и полного профиля на одной странице.
+
+    driver_factory(lean) должен возвращать новый драйвер с нужным профилем.
+    """
+    report = {}
+    for lean in (True, False):
+        name = "lean" if lean else "full"
+        driver = driver_factory(lean)
+        try:
+            samples = [measure_page_cost(driver, url) for _ in range(runs)]
+        finally:
+            driver.quit()
+
+        report[name] = {
+            "bytes": sum(s.get("bytes", 0) for s in samples) / runs,
+            "requests": sum(s.get("requests", 0) for s in samples) / runs,
+            "wall_time": sum(s["wall_time"] for s in samples) / runs
+        }
+        logger.info(
+            f"Профиль {name}: {report[name]['bytes'] / 1024:.0f} КБ, "
+            f"{report[name]['requests']:.0f} запросов, {report[name]['wall_time']:.2f} с"
+        )
+    return report
@@ -0,0 +1,218 @@
+import re
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ChannelFetcher import DEFAULT_HEADERS
+from Metrics import timer, record_error
+from RateLimit import get_throttle, is_throttled
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_URL = "https://t.me"
+DEFAULT_VALIDATION_TTL = 3 * 24 * 3600
+
+KIND_CHANNEL = "channel"
+KIND_GROUP = "group"
+KIND_BOT = "bot"
+KIND_USER = "user"
+KIND_DEAD = "dead"
+
+_PAGE_TITLE_RE = re.compile(r'class="tgme_page_title"')
+_PAGE_EXTRA_RE = re.compile(r'class="tgme_page_extra">\s*([^<]*)<')
+
+
+def handle_from_url(telegram_url):
+    """Ключ кэша и путь проверки: t.me/<name> или код приглашения.
+
+    Публичные имена без учета регистра - приводятся к нижнему. Коды приглашений
+    (+code, joinchat/code) регистрозависимы и остаются как есть.
+    """
+    path = urlparse(telegram_url if '://' in telegram_url else f"https://{telegram_url}").path
+    parts = [p for p in path.split('/') if p]
+    if not parts:
+        return None
+    if parts[0].lower() == "joinchat" and len(parts) > 1:
+        return f"joinchat/{parts[1]}"
+    if parts[0].lower() == "s" and len(parts) > 1:
+        return f"s/{parts[1].lower()}"
+    if parts[0].startswith('+'):
+        return parts[0]
+    return parts[0].lower()
+
+
+def classify_preview(html, handle):
+    """Тип по публичной странице предпросмотра t.me: channel, group, bot, user или dead"""
+    if not html or not _PAGE_TITLE_RE.search(html):
+        return KIND_DEAD
+
+    match = _PAGE_EXTRA_RE.search(html)
+    extra = match.group(1).strip().lower() if match else ""
+    if "subscriber" in extra or "подписчик" in extra:
+        return KIND_CHANNEL
+    if "member" in extra or "участник" in extra:
+        return KIND_GROUP
+    # Имена ботов в Telegram обязаны заканчиваться на "bot"
+    if handle and handle.endswith("bot"):
+        return KIND_BOT
+    return KIND_USER
+
+
+class ValidationCache:
+    """Двухуровневый кэш проверок: LRU в памяти и SQLite на диске с TTL"""
+
+    def __init__(self, db_path=None, ttl=DEFAULT_VALIDATION_TTL, max_memory_items=10000):
+        self.ttl = ttl
+        self.max_memory_items = max_memory_items
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if db_path:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS handles ("
+                "handle TEXT PRIMARY KEY, kind TEXT NOT NULL, checked_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def get(self, handle):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(handle)
+            if entry and now - entry[1] < self.ttl:
+                self._memory.move_to_end(handle)
+                return entry[0]
+
+            if self._conn is None:
+                return None
+            row = self._conn.execute(
+                "SELECT kind, checked_at FROM handles WHERE handle = ?", (handle,)
+            ).fetchone()
+            if row and now - row[1] < self.ttl:
+                self._remember(handle, row[0], row[1])
+                return row[0]
+        return None
+
+    def put(self, handle, kind):
+        now = time.time()
+        with self._lock:
+            self._remember(handle, kind, now)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO handles (handle, kind, checked_at) VALUES (?, ?, ?)",
+                    (handle, kind, now)
+                )
+                self._conn.commit()
+
+    def _remember(self, handle, kind, checked_at):
+        self._memory[handle] = (kind, checked_at)
+        self._memory.move_to_end(handle)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class TelegramValidator:
+    """Проверка найденных t.me ссылок в фоне, с общим кэшем по имени"""
+
+    def __init__(self, cache=None, max_workers=8, timeout=10, base_url=TELEGRAM_URL):
+        self.cache = cache or ValidationCache()
+        self.timeout = timeout
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(DEFAULT_HEADERS)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="TGValidator")
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+
+        self.stats = {"checked": 0, "cache_hits": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def validate(self, telegram_url):
+        """Тип ссылки (channel/group/bot/user/dead); None, если проверить не удалось"""
+        handle = handle_from_url(telegram_url)
+        if not handle:
+            return KIND_DEAD
+
+        kind = self.cache.get(handle)
+        if kind:
+            self._count("cache_hits")
+            return kind
+
+        # Одно и то же имя из разных каналов проверяется одним запросом: первый
+        # вызвавший загружает страницу сам, остальные ждут его результата. Загрузка
+        # идет в потоке вызывающего, а не в self._executor - иначе задачи submit(),
+        # занявшие все потоки пула, ждали бы загрузок, стоящих за ними в очереди
+        with self._pending_lock:
+            future = self._pending.get(handle)
+            owner = future is None
+            if owner:
+                future = self._pending[handle] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            kind = self._fetch_kind(handle)
+            future.set_result(kind)
+            return kind
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._pending_lock:
+                self._pending.pop(handle, None)
+
+    def _fetch_kind(self, handle):
+        try:
+            url = f"{self.base_url}/{handle}"
+            with timer("page_load.telegram"), get_throttle(url).request() as outcome:
+                response = self.session.get(url, timeout=self.timeout)
+                outcome.throttled = is_throttled(response.status_code, response.url)
+            if response.status_code == 404:
+                kind = KIND_DEAD
+            else:
+                response.raise_for_status()
+                kind = classify_preview(response.text, handle)
+        except requests.exceptions.RequestException as e:
+            self._count("errors")
+            record_error(e, "validator")
+            logger.debug(f"Ошибка проверки t.me/{handle}: {str(e)}")
+            return None
+
+        self._count("checked")
+        self.cache.put(handle, kind)
+        return kind
+
+    def submit(self, telegram_url, callback):
+        """Фоновая проверка: callback(kind) вызывается из потока валидатора"""
+        def run():
+            try:
+                callback(self.validate(telegram_url))
+            except Exception as e:
+                logger.error(f"Ошибка проверки ссылки {telegram_url}: {str(e)}")
+
+        return self._executor.submit(run)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.session.close()
+        self.cache.close()
@@ -0,0 +1,156 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Счетчики и гистограммы длительностей по именам, общие для всех потоков процесса
+_counters = {}
+_histograms = {}
+_metrics_lock = threading.Lock()
+_HISTORY_SIZE = 1000
+
+# Последние снимки из процессов-воркеров ProcessPool: source -> export_raw()
+_remote = {}
+
+
+def increment(name, value=1):
+    with _metrics_lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name, duration):
+    with _metrics_lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = {
+                "count": 0,
+                "total": 0.0,
+                "history": deque(maxlen=_HISTORY_SIZE)
+            }
+        histogram["count"] += 1
+        histogram["total"] += duration
+        histogram["history"].append(duration)
+
+
+@contextmanager
+def timer(name):
+    """Длительность блока в гистограмму name (записывается и при исключении)"""
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        observe(name, time.monotonic() - started)
+
+
+def record_error(error, stage):
+    """Ошибка в счетчик по этапу и типу исключения: errors.<stage>.<Type>"""
+    increment(f"errors.{stage}.{type(error).__name__}")
+
+
+def export_raw():
+    """Сырые данные для передачи в другой процесс (см. merge_remote)"""
+    with _metrics_lock:
+        return {
+            "counters": dict(_counters),
+            "histograms": {
+                name: {"count": h["count"], "total": h["total"], "history": list(h["history"])}
+                for name, h in _histograms.items()
+            }
+        }
+
+
+def merge_remote(source, raw):
+    """Снимок метрик процесса-воркера; в сводке суммируется с метриками этого процесса"""
+    with _metrics_lock:
+        _remote[source] = raw
+
+
+def get_counters():
+    with _metrics_lock:
+        result = dict(_counters)
+        for raw in _remote.values():
+            for name, value in raw["counters"].items():
+                result[name] = result.get(name, 0) + value
+    return result
+
+
+def get_histograms():
+    """Сводка по гистограммам: count, среднее, p50/p95, максимум"""
+    merged = {}
+    with _metrics_lock:
+        sources = [
+            {name: (h["count"], h["total"], list(h["history"])) for name, h in _histograms.items()}
+        ] + [
+            {name: (h["count"], h["total"], h["history"]) for name, h in raw["histograms"].items()}
+            for raw in _remote.values()
+        ]
+    for source in sources:
+        for name, (count, total, history) in source.items():
+            entry = merged.setdefault(name, [0, 0.0, []])
+            entry[0] += count
+            entry[1] += total
+            entry[2].extend(history)
+
+    result = {}
+    for name, (count, total, history) in merged.items():
+        if not count or not history:
+            continue
+        history.sort()
+        result[name] = {
+            "count": count,
+            "avg": total / count,
+            "p50": history[len(history) // 2],
+            "p95": history[min(int(len(history) * 0.95), len(history) - 1)],
+            "max": history[-1]
+        }
+    return result
+
+
+def reset():
+    with _metrics_lock:
+        _counters.clear()
+        _histograms.clear()
+        _remote.clear()
+
+
+class MetricsExporter:
+    """Периодическая запись снимка метрик в JSON файл (атомарной заменой)"""
+
+    def __init__(self, collect, path, interval=10.0):
+        self.collect = collect
+        self.path = path
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="MetricsExporter", daemon=True)
+        self._thread.start()
+        logger.info(f"Метрики пишутся в {self.path}")
+        return self
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.export()
+        self.export()
+
+    def export(self):
+        try:
+            snapshot = self.collect()
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Ошибка записи метрик: {str(e)}")
+
+    def close(self, wait=True):
+        self._stop_event.set()
+        if wait and self._thread:
+            self._thread.join()
@@ -0,0 +1,180 @@
+import time
+import queue
+import logging
+import threading
+import multiprocessing
+from logging.handlers import QueueHandler
+
+import Metrics
+import Tracing
+
+logger = logging.getLogger(__name__)
+
+# Как часто процесс-воркер отправляет координатору снимок своих метрик
+METRICS_INTERVAL = 5.0
+
+
+def _worker_process_main(process_id, task_queue, result_queue, log_queue, stop_event, thread_count, options):
+    """Точка входа процесса-воркера: свои драйверы, HTTP клиент и парсер, общий только обмен очередями"""
+    root_logger = logging.getLogger()
+    root_logger.handlers[:] = [QueueHandler(log_queue)]
+    root_logger.setLevel(logging.INFO)
+
+    # Импорт внутри процесса: Selenium и парсер поднимаются уже в дочернем интерпретаторе
+    from Search import YouTubeSearcher
+
+    searcher = YouTubeSearcher(
+        thread_count=thread_count,
+        search_thread_count=1,
+        use_channel_store=False,
+        **options
+    )
+
+    def channel_thread(worker_id):
+        while not stop_event.is_set():
+            try:
+                channel_url = task_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            started = time.monotonic()
+            try:
+                telegram_url = searcher._process_single_channel(channel_url)
+                result_queue.put(("result", worker_id, channel_url, telegram_url, time.monotonic() - started))
+            except Exception as e:
+                # Сбой обработки уходит отдельным видом результата, без записи "Not found"
+                Metrics.record_error(e, "channel")
+                result_queue.put(("error", worker_id, channel_url, str(e), time.monotonic() - started))
+
+    threads = [
+        threading.Thread(target=Tracing.profiled(channel_thread), args=(f"{process_id}-{i}",),
+                         name=f"ChannelWorker-{i}")
+        for i in range(thread_count)
+    ]
+    for thread in threads:
+        thread.start()
+    # Гистограммы драйверов и загрузок страниц живут в этом процессе - периодически
+    # отправляем их в координатор
+    while not stop_event.wait(METRICS_INTERVAL):
+        result_queue.put(("metrics", process_id, None, Metrics.export_raw(), 0.0))
+    for thread in threads:
+        thread.join()
+
+    searcher.stop()
+    searcher._close_stores()
+    result_queue.put(("metrics", process_id, None, Metrics.export_raw(), 0.0))
+    if Tracing.is_enabled():
+        # Трассировку пишет координатор: события процесса уходят ему одним пакетом
+        result_queue.put(("trace", process_id, None, Tracing.export_events(), 0.0))
+    result_queue.put(("exit", process_id, None, None, 0.0))
+
+
+class ProcessWorkerPool:
+    """Пул процессов для обработки каналов в обход GIL.
+
+    Каждый процесс поднимает свой YouTubeSearcher без индекса каналов (драйверы,
+    HTTP клиент и TelegramParser у каждого свои) и thread_count потоков-воркеров.
+    Каналы приходят через task_queue, результаты и логи возвращаются в
+    координатор и отдаются в result_handler из отдельного потока.
+    """
+
+    def __init__(self, result_handler, process_count=2, thread_count=3, queue_size=None, **options):
+        self.result_handler = result_handler
+        self.process_count = max(1, process_count)
+        self.thread_count = max(1, thread_count)
+        self.options = options
+
+        # spawn одинаков для Windows-сборки и Linux: дочерний процесс не наследует
+        # потоки и драйверы родителя
+        self._context = multiprocessing.get_context("spawn")
+        self.task_queue = self._context.Queue(
+            maxsize=queue_size or self.process_count * self.thread_count * 20
+        )
+        self._result_queue = self._context.Queue()
+        self._log_queue = self._context.Queue()
+        self._stop_event = self._context.Event()
+        self._processes = []
+        self._threads = []
+
+    @property
+    def worker_ids(self):
+        return [f"{p}-{t}" for p in range(self.process_count) for t in range(self.thread_count)]
+
+    def start(self):
+        for process_id in range(self.process_count):
+            process = self._context.Process(
+                target=_worker_process_main,
+                args=(process_id, self.task_queue, self._result_queue, self._log_queue,
+                      self._stop_event, self.thread_count, self.options),
+                name=f"ChannelProcess-{process_id}",
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+
+        for target, name in ((self._drain_results, "ProcessResults"), (self._drain_logs, "ProcessLogs")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        logger.info(f"Запущено {self.process_count} процессов по {self.thread_count} воркеров")
+        return self
+
+    def _drain_results(self):
+        """Результаты от процессов до выхода последнего из них"""
+        running = self.process_count
+        while running:
+            try:
+                kind, worker_id, channel_url, payload, busy_time = self._result_queue.get(timeout=0.5)
+            except queue.Empty:
+                if not any(p.is_alive() for p in self._processes):
+                    break
+                continue
+
+            if kind == "exit":
+                running -= 1
+                continue
+            if kind == "metrics":
+                Metrics.merge_remote(f"process-{worker_id}", payload)
+                continue
+            if kind == "trace":
+                Tracing.merge_events(payload)
+                continue
+            try:
+                self.result_handler(worker_id, channel_url, payload, busy_time, kind == "error")
+            except Exception as e:
+                logger.error(f"Ошибка обработки результата процесса: {str(e)}")
+
+    def _drain_logs(self):
+        """Записи логов дочерних процессов уходят в обработчики координатора"""
+        while True:
+            try:
+                record = self._log_queue.get(timeout=0.5)
+            except queue.Empty:
+                if self._stop_event.is_set() and not any(p.is_alive() for p in self._processes):
+                    break
+                continue
+            logging.getLogger(record.name).handle(record)
+
+    def stop(self):
+        """Сигнал процессам: дообработать текущие каналы и завершиться"""
+        self._stop_event.set()
+
+    def join(self, timeout=60):
+        """Ожидание выхода процессов; зависшие завершаются принудительно"""
+        self.stop()
+        # Каналы, оставшиеся в очереди, никто уже не заберет
+        self.task_queue.cancel_join_thread()
+
+        deadline = time.monotonic() + timeout
+        for process in self._processes:
+            process.join(timeout=max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                logger.warning(f"Процесс {process.name} не завершился, принудительная остановка")
+                process.terminate()
+                process.join(timeout=5)
+
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._processes = []
+        self._threads = []
@@ -0,0 +1,157 @@
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class _QueryState:
+    __slots__ = ("query", "score", "runs", "empty_runs", "ready_at", "last_run", "in_flight", "total_new")
+
+    def __init__(self, query):
+        self.query = query
+        self.score = None  # None - запрос еще не запускался
+        self.runs = 0
+        self.empty_runs = 0
+        self.ready_at = 0.0
+        self.last_run = 0.0
+        self.in_flight = False
+        self.total_new = 0
+
+
+class QueryScheduler:
+    """Распределение поисковых запросов между потоками по недавней отдаче новых каналов"""
+
+    def __init__(self, queries, base_backoff=30.0, max_backoff=1800.0, decay=0.5):
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.decay = decay
+        self._states = [_QueryState(q) for q in queries]
+        self._cond = threading.Condition()
+
+        logger.info(f"Планировщик запросов: {len(self._states)} запросов")
+
+    @staticmethod
+    def split_tags(text):
+        """Разбивка строки тегов "через запятую" на отдельные запросы без повторов"""
+        queries = []
+        seen = set()
+        for part in text.replace("\n", ",").split(","):
+            query = " ".join(part.split())
+            if query and query.lower() not in seen:
+                seen.add(query.lower())
+                queries.append(query)
+        return queries
+
+    def __len__(self):
+        return len(self._states)
+
+    def _pick(self, now):
+        """Готовый запрос с лучшей отдачей; новые запросы идут первыми, при равенстве - самый давний"""
+        candidates = [s for s in self._states if not s.in_flight and s.ready_at <= now]
+        if not candidates:
+            return None
+        return max(
+            candidates,
+            key=lambda s: (s.score is None, s.score or 0.0, -s.last_run)
+        )
+
+    def acquire_nowait(self):
+        """Неблокирующая выдача запроса: (запрос или None, через сколько секунд появится готовый)"""
+        with self._cond:
+            now = time.monotonic()
+            state = self._pick(now)
+            if state:
+                state.in_flight = True
+                state.last_run = now
+                return state.query, 0.0
+
+            pending = [s.ready_at - now for s in self._states if not s.in_flight]
+            return None, max(min(pending), 0.0) if pending else 1.0
+
+    def acquire(self, stop_event):
+        """Выдача следующего запроса; ждет, пока какой-нибудь запрос не выйдет из паузы"""
+        with self._cond:
+            while not stop_event.is_set():
+                now = time.monotonic()
+                state = self._pick(now)
+                if state:
+                    state.in_flight = True
+                    state.last_run = now
+                    return state.query
+
+                pending = [s.ready_at for s in self._states if not s.in_flight]
+                timeout = min(pending) - now if pending else 1.0
+                # Короткий шаг ожидания, чтобы вовремя заметить остановку
+                self._cond.wait(timeout=min(max(timeout, 0.05), 1.0))
+        return None
+
+    def release(self, query, new_channels):
+        """Учет результата прогона запроса и назначение паузы для исчерпанных"""
+        with self._cond:
+            state = next(s for s in self._states if s.query == query)
+            state.in_flight = False
+            state.runs += 1
+            state.total_new += new_channels
+
+            if state.score is None:
+                state.score = float(new_channels)
+            else:
+                state.score = self.decay * state.score + (1 - self.decay) * new_channels
+
+            if new_channels:
+                state.empty_runs = 0
+                state.ready_at = 0.0
+            else:
+                state.empty_runs += 1
+                backoff = min(self.base_backoff * 2 ** (state.empty_runs - 1), self.max_backoff)
+                state.ready_at = time.monotonic() + backoff
+                logger.info(f"Запрос '{query}' не дал новых каналов, пауза {backoff:.0f} с")
+
+            self._cond.notify_all()
+
+    def export_state(self):
+        """Состояние запросов для контрольной точки (паузы - в секундах от текущего момента)"""
+        now = time.monotonic()
+        with self._cond:
+            return [
+                {
+                    "query": s.query,
+                    "score": s.score,
+                    "runs": s.runs,
+                    "empty_runs": s.empty_runs,
+                    "total_new": s.total_new,
+                    "backoff_left": max(s.ready_at - now, 0.0)
+                }
+                for s in self._states
+            ]
+
+    def restore_state(self, saved_states):
+        """Восстановление очков, счетчиков и пауз из export_state(); незнакомые запросы пропускаются"""
+        now = time.monotonic()
+        saved = {item["query"]: item for item in saved_states}
+        with self._cond:
+            for state in self._states:
+                item = saved.get(state.query)
+                if not item:
+                    continue
+                state.score = item["score"]
+                state.runs = item["runs"]
+                state.empty_runs = item["empty_runs"]
+                state.total_new = item["total_new"]
+                state.ready_at = now + item["backoff_left"] if item["backoff_left"] else 0.0
+            self._cond.notify_all()
+
+    def get_stats(self):
+        """Статистика по каждому запросу"""
+        now = time.monotonic()
+        with self._cond:
+            return {
+                s.query: {
+                    "runs": s.runs,
+                    "total_new": s.total_new,
+                    "score": s.score or 0.0,
+                    "backoff_left": max(s.ready_at - now, 0.0)
+                }
+                for s in self._states
+            }
@@ -0,0 +1,273 @@
+import time
+import random
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from urllib.parse import urlparse
+
+from Metrics import increment
+
+logger = logging.getLogger(__name__)
+
+# Запросов в секунду на хост в одном процессе и допустимый всплеск
+DEFAULT_RATE = 8.0
+DEFAULT_BURST = 16
+# Пауза всего хоста после признака троттлинга (429/503, consent, captcha)
+THROTTLE_PAUSE = 10.0
+
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+def retry_delay(attempt, base=1.0, cap=30.0):
+    """Экспоненциальная задержка перед повтором с полным джиттером: U(0, min(cap, base * 2^attempt))"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def is_throttled(status_code, url):
+    """Признаки того, что YouTube (или другой хост) ограничивает нас"""
+    if status_code in THROTTLE_STATUS_CODES:
+        return True
+    parsed = urlparse(url or "")
+    return "consent." in parsed.netloc or parsed.path.startswith("/sorry") or "captcha" in parsed.path
+
+
+class TokenBucket:
+    """Token bucket: не больше rate запросов в секунду в среднем, всплеск до burst"""
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self):
+        """Забрать токен (при нехватке - в долг) и вернуть, сколько секунд ждать своей очереди"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            return max(-self._tokens / self.rate, 0.0)
+
+    def acquire(self, stop_event=None):
+        delay = self.reserve()
+        if delay > 0:
+            if stop_event is not None:
+                stop_event.wait(delay)
+            else:
+                time.sleep(delay)
+
+    def pause(self, seconds):
+        """Отодвинуть следующие запросы на seconds (долг в токенах)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+    def set_rate(self, rate, burst=None):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+            if burst is not None:
+                self.burst = burst
+
+
+class AIMDController:
+    """Адаптивный предел одновременных запросов (additive increase / multiplicative decrease).
+
+    Каждые window запросов предел растет на increase, если доля ошибок и p95
+    задержки в норме, иначе умножается на decrease. Троттлинг уменьшает предел сразу.
+    """
+
+    def __init__(self, initial=8, min_limit=1, max_limit=64, increase=1.0, decrease=0.5,
+                 latency_target=8.0, error_threshold=0.1, window=20):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.error_threshold = error_threshold
+        self.window = window
+        self.in_flight = 0
+        self._samples = []
+        self._cond = threading.Condition()
+
+    def try_acquire(self):
+        with self._cond:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return True
+            return False
+
+    def acquire(self, stop_event=None):
+        """Занять место; при остановке место выдается без ожидания, чтобы release остался парным"""
+        with self._cond:
+            while self.in_flight >= int(self.limit) and not (stop_event and stop_event.is_set()):
+                self._cond.wait(timeout=0.5)
+            self.in_flight += 1
+
+    def release(self, latency, error=False, throttled=False):
+        with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self._samples.clear()
+                self._decrease("троттлинг")
+            else:
+                self._samples.append((latency, error))
+                if len(self._samples) >= self.window:
+                    self._evaluate()
+            self._cond.notify_all()
+
+    def _evaluate(self):
+        latencies = sorted(latency for latency, _ in self._samples)
+        p95 = latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)]
+        error_rate = sum(1 for _, error in self._samples if error) / len(self._samples)
+        self._samples.clear()
+
+        if error_rate > self.error_threshold:
+            self._decrease(f"ошибок {error_rate:.0%}")
+        elif p95 > self.latency_target:
+            self._decrease(f"p95 задержки {p95:.1f} с")
+        else:
+            self.limit = min(self.max_limit, self.limit + self.increase)
+
+    def _decrease(self, reason):
+        self.limit = max(self.min_limit, self.limit * self.decrease)
+        logger.info(f"Предел параллельных запросов снижен до {int(self.limit)}: {reason}")
+
+
+class _Outcome:
+    __slots__ = ("throttled", "error")
+
+    def __init__(self):
+        self.throttled = False
+        self.error = False
+
+
+class HostThrottle:
+    """Ограничение запросов к одному хосту: token bucket по частоте и AIMD по параллельности"""
+
+    def __init__(self, host, rate=DEFAULT_RATE, burst=DEFAULT_BURST, **aimd_options):
+        self.host = host
+        self.bucket = TokenBucket(rate, burst)
+        self.controller = AIMDController(**aimd_options)
+        self.stats = {"requests": 0, "errors": 0, "throttled": 0}
+        self._stats_lock = threading.Lock()
+
+    def wait_turn(self, stop_event=None):
+        """Только ограничение частоты - для действий без ответа сервера (прокрутка выдачи)"""
+        if _settings["enabled"]:
+            self.bucket.acquire(stop_event)
+
+    @contextmanager
+    def request(self, stop_event=None):
+        """Запрос к хосту: ожидание места и токена; в блоке выставляется outcome.throttled"""
+        if not _settings["enabled"]:
+            yield _Outcome()
+            return
+        self.controller.acquire(stop_event)
+        self.bucket.acquire(stop_event)
+        outcome = _Outcome()
+        started = time.monotonic()
+        try:
+            yield outcome
+        except Exception:
+            outcome.error = True
+            raise
+        finally:
+            self._finish(outcome, time.monotonic() - started)
+
+    @asynccontextmanager
+    async def request_async(self):
+        """То же для asyncio: ожидание без блокировки цикла событий"""
+        if not _settings["enabled"]:
+            yield _Outcome()
+            return
+        while not self.controller.try_acquire():
+            await asyncio.sleep(0.05)
+        outcome = _Outcome()
+        started = time.monotonic()
+        try:
+            delay = self.bucket.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                started = time.monotonic()
+            yield outcome
+        except Exception:
+            outcome.error = True
+            raise
+        finally:
+            self._finish(outcome, time.monotonic() - started)
+
+    def _finish(self, outcome, latency):
+        with self._stats_lock:
+            self.stats["requests"] += 1
+            if outcome.error:
+                self.stats["errors"] += 1
+            if outcome.throttled:
+                self.stats["throttled"] += 1
+        if outcome.throttled:
+            increment(f"throttled.{self.host}")
+            logger.warning(f"{self.host} ограничивает запросы, пауза {THROTTLE_PAUSE:.0f} с")
+            self.bucket.pause(THROTTLE_PAUSE)
+        self.controller.release(latency, error=outcome.error, throttled=outcome.throttled)
+
+    def get_stats(self):
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return dict(
+            stats,
+            rate=self.bucket.rate,
+            concurrency_limit=int(self.controller.limit),
+            in_flight=self.controller.in_flight
+        )
+
+
+# Ограничители по хостам, общие для всех воркеров процесса
+_throttles = {}
+_throttles_lock = threading.Lock()
+_settings = {"rate": DEFAULT_RATE, "burst": DEFAULT_BURST, "enabled": True}
+
+
+def _host_key(host_or_url):
+    host = urlparse(host_or_url).netloc if "://" in host_or_url else host_or_url
+    host = host.split(":")[0].lower()
+    for prefix in ("www.", "m."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    return host
+
+
+def get_throttle(host_or_url):
+    """Общий ограничитель для хоста (www.youtube.com и youtube.com - один хост)"""
+    key = _host_key(host_or_url)
+    with _throttles_lock:
+        throttle = _throttles.get(key)
+        if throttle is None:
+            throttle = _throttles[key] = HostThrottle(key, _settings["rate"], _settings["burst"])
+        return throttle
+
+
+def configure(rate=None, burst=None, enabled=None):
+    """Частота запросов на хост для этого процесса (применяется и к уже созданным ограничителям).
+
+    enabled=False отключает ограничения целиком - для локальных бенчмарков.
+    """
+    with _throttles_lock:
+        if enabled is not None:
+            _settings["enabled"] = enabled
+        if rate is not None:
+            _settings["rate"] = rate
+        if burst is not None:
+            _settings["burst"] = burst
+        for throttle in _throttles.values():
+            throttle.bucket.set_rate(_settings["rate"], _settings["burst"])
+
+
+def get_throttle_stats():
+    with _throttles_lock:
+        return {host: throttle.get_stats() for host, throttle in _throttles.items()}
@@ -0,0 +1,143 @@
+import os
+import json
+import time
+import queue
+import logging
+import threading
+from datetime import datetime
+from openpyxl import Workbook
+from Metrics import observe, record_error
+from Tracing import span
+
+logger = logging.getLogger(__name__)
+
+EXCEL_HEADERS = ['YouTube URL', 'Telegram URL', 'Дата', 'Время']
+
+
+class ResultWriter:
+    """Фоновая запись результатов: журнал JSONL по мере поступления и итоговый xlsx"""
+
+    def __init__(self, results_dir="results", flush_interval=2.0, batch_size=50, excel_interval=300.0):
+        self.flush_interval = flush_interval
+        self.batch_size = max(1, batch_size)
+        self.excel_interval = excel_interval
+
+        os.makedirs(results_dir, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.journal_path = os.path.join(results_dir, f"results_{timestamp}.jsonl")
+        self.excel_path = os.path.join(results_dir, f"results_{timestamp}.xlsx")
+
+        self._queue = queue.Queue()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.rows_written = 0
+        self._last_excel_rows = 0
+
+    def start(self):
+        """Запуск потока записи"""
+        self._thread = threading.Thread(target=self._run, name="ResultWriter")
+        self._thread.start()
+        logger.info(f"Результаты пишутся в журнал: {self.journal_path}")
+        return self
+
+    def write(self, result):
+        """Постановка результата в очередь записи (не блокирует вызывающий поток)"""
+        now = datetime.now()
+        self._queue.put([
+            result['youtube_url'],
+            result['telegram_url'],
+            now.strftime('%Y-%m-%d'),
+            now.strftime('%H:%M:%S')
+        ])
+
+    def _run(self):
+        last_excel_build = time.monotonic()
+        while True:
+            batch = self._collect_batch()
+            if batch:
+                with span("sink.journal", rows=len(batch)):
+                    self._append_journal(batch)
+
+            stopping = self._stop_event.is_set() and self._queue.empty()
+            if stopping or (self.excel_interval and time.monotonic() - last_excel_build >= self.excel_interval):
+                if self.rows_written != self._last_excel_rows:
+                    with span("sink.excel"):
+                        self.build_excel()
+                last_excel_build = time.monotonic()
+
+            if stopping:
+                break
+
+    def _collect_batch(self):
+        """Накопление пачки строк до batch_size или истечения flush_interval"""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+            if self._stop_event.is_set() and self._queue.empty():
+                break
+        return batch
+
+    def _append_journal(self, batch):
+        """Дозапись пачки в журнал с fsync, чтобы строки пережили падение процесса"""
+        started = time.monotonic()
+        try:
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                for row in batch:
+                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.rows_written += len(batch)
+            observe("journal_flush", time.monotonic() - started)
+        except Exception as e:
+            record_error(e, "writer")
+            logger.error(f"Ошибка записи в журнал результатов: {str(e)}")
+
+    def _read_journal(self):
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Недописанная последняя строка после падения
+                    logger.debug("Пропущена поврежденная строка журнала")
+
+    def build_excel(self):
+        """Сборка xlsx из журнала за один проход (write_only режим openpyxl)"""
+        started = time.monotonic()
+        try:
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet("Результаты")
+            ws.append(EXCEL_HEADERS)
+            rows = 0
+            for row in self._read_journal():
+                ws.append(row)
+                rows += 1
+
+            # Запись во временный файл и атомарная замена
+            tmp_path = self.excel_path + ".tmp"
+            wb.save(tmp_path)
+            os.replace(tmp_path, self.excel_path)
+            self._last_excel_rows = rows
+            observe("excel_build", time.monotonic() - started)
+            logger.info(f"Excel файл обновлен: {self.excel_path} ({rows} строк)")
+        except Exception as e:
+            record_error(e, "writer")
+            logger.error(f"Ошибка сохранения в Excel: {str(e)}")
+
+    def close(self, wait=True):
+        """Остановка записи: дописывает очередь и собирает итоговый xlsx"""
+        self._stop_event.set()
+        if wait and self._thread:
+            self._thread.join()
@@ -10,9 +10,24 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
+import shutil
 import threading
 import queue
 from urllib.parse import urlparse
+from DriverPool import DriverPool
+from ChannelFetcher import ChannelPageFetcher
+from ChannelStore import ChannelStore, DEFAULT_NOT_FOUND_TTL
+from QueryScheduler import QueryScheduler
+from Waits import wait_until, get_wait_stats
+from TGPars import TelegramParser
+from LinkValidator import TelegramValidator, ValidationCache, KIND_DEAD
+import Metrics
+import Tracing
+from Tracing import span, profiled
+from Checkpoint import Checkpointer, DEFAULT_CHECKPOINT_INTERVAL
+from RateLimit import DEFAULT_RATE, configure as configure_rate_limit, get_throttle, get_throttle_stats, \
+    is_throttled, retry_delay
+from DriverProfile import apply_lean_profile, enable_request_blocking, compare_profiles
 
 # Настройка логирования
 logging.getLogger('selenium').setLevel(logging.WARNING)
@@ -22,21 +37,135 @@ logging.getLogger('WDM').setLevel(logging.INFO)
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# Все href по селектору за один round-trip к WebDriver (начиная с arguments[1]-го элемента)
+COLLECT_HREFS_JS = (
+    "return Array.from(document.querySelectorAll(arguments[0])).slice(arguments[1] || 0)"
+    ".map(a => a.href || '');"
+)
+COUNT_ELEMENTS_JS = "return document.querySelectorAll(arguments[0]).length;"
+SEARCH_LINK_SELECTOR = "a#video-title-link, a.yt-simple-endpoint"
+
+YOUTUBE_URL = "https://www.youtube.com"
+# Сколько раз прокручивать выдачу одного запроса за сессию
+DEFAULT_SCROLL_DEPTH = 50
+
+# Путь к chromedriver определяется один раз на процесс
+_chromedriver_path = None
+_chromedriver_lock = threading.Lock()
+
+
+def is_offline_mode():
+    """Офлайн-режим: драйвер не скачивается и версия не проверяется по сети"""
+    return os.environ.get("XPARSER_OFFLINE", "").lower() in ("1", "true", "yes")
+
+
+def _bundled_chromedriver_candidates():
+    """Возможные места поставляемого вместе с программой chromedriver"""
+    name = "chromedriver.exe" if sys.platform.startswith("win") else "chromedriver"
+    dirs = []
+    if getattr(sys, 'frozen', False):
+        dirs.append(os.path.dirname(sys.executable))
+        dirs.append(getattr(sys, '_MEIPASS', ''))
+    dirs.append(os.path.dirname(os.path.abspath(__file__)))
+    return [os.path.join(d, name) for d in dirs if d]
+
+
+def resolve_chromedriver_path(offline=None):
+    """Путь к chromedriver: XPARSER_CHROMEDRIVER, поставляемый бинарник, затем WDM.
+
+    chromedriver из PATH берется только в офлайн-режиме: его версия не сверяется с Chrome,
+    а WDM подбирает драйвер под установленный браузер.
+    """
+    global _chromedriver_path
+    offline = is_offline_mode() if offline is None else offline
+
+    with _chromedriver_lock:
+        if _chromedriver_path:
+            return _chromedriver_path
+
+        configured = os.environ.get("XPARSER_CHROMEDRIVER")
+        candidates = ([configured] if configured else []) + _bundled_chromedriver_candidates()
+        path = next((c for c in candidates if os.path.isfile(c)), None)
+
+        if not path:
+            if offline:
+                path = shutil.which("chromedriver")
+                if not path:
+                    raise RuntimeError(
+                        "Офлайн-режим: chromedriver не найден. "
+                        "Укажите путь в XPARSER_CHROMEDRIVER, положите его рядом с программой или в PATH"
+                    )
+            else:
+                path = ChromeDriverManager().install()
+
+        _chromedriver_path = path
+        logger.info(f"Используется chromedriver: {path}")
+        return path
+
 
 class YouTubeSearcher:
-    def __init__(self, result_callback=None, thread_count=3):
+    def __init__(self, result_callback=None, thread_count=3, use_http=True,
+                 use_channel_store=True, not_found_ttl=DEFAULT_NOT_FOUND_TTL, search_thread_count=2,
+                 lean_profile=True, use_async=False, validate_links=False, process_count=0,
+                 checkpoint_path=None, checkpoint_interval=DEFAULT_CHECKPOINT_INTERVAL, resume_state=None,
+                 request_rate=DEFAULT_RATE, base_url=YOUTUBE_URL, max_scroll_depth=DEFAULT_SCROLL_DEPTH):
+        # Метрики процесса считаются заново для каждого запуска поиска
+        Metrics.reset()
+        self.started_at = time.monotonic()
         self.stats = {
             "total_queries": 0,
             "total_channels_found": 0,
             "last_search_time": None
         }
         self.found_channels = set()
+        # Каналы, отобранные поиском, но еще без результата (в очереди, у воркера или на проверке)
+        self.pending_channels = set()
         self.channels_lock = threading.Lock()
         self.stop_event = threading.Event()
         self.result_callback = result_callback
         self.thread_count = min(max(1, thread_count), 10)
-        self.work_queue = queue.Queue()
+        # Ограниченная очередь: поиск ждет, пока воркеры разгребут каналы
+        self.work_queue = queue.Queue(maxsize=self.thread_count * 20)
+        self.workers = []
+        self.worker_stats = {}
+        self.search_thread_count = min(max(1, search_thread_count), 10)
+        self.lean_profile = lean_profile
+        # Режим без браузера: все этапы на asyncio поверх HTTP (см. AsyncEngine)
+        self.use_async = use_async
+        # Обработка каналов в отдельных процессах по thread_count воркеров (см. ProcessPool)
+        self.process_count = max(0, process_count)
+        self.process_pool = None
+        self.use_http = use_http
+        # Адрес YouTube; в офлайн бенчмарках - локальный сервер с записанными страницами
+        self.base_url = base_url.rstrip('/')
+        # Запросов в секунду на хост (общий лимит на все процессы); 0 или None - без ограничений
+        self.request_rate = request_rate
+        self._configure_rate_limit()
+        # Сколько раз прокручивать выдачу одного запроса за сессию (в async - страниц продолжения)
+        self.max_scroll_depth = max_scroll_depth
+        self.scheduler = None
+        self.query_text = None
+        # Позиции выдачи async конвейера: запрос -> continuation следующей страницы
+        self.search_positions = {}
+        # Контрольная точка: периодическое сохранение состояния для продолжения после сбоя
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.resume_state = resume_state
+        if resume_state:
+            self._restore_state(resume_state)
         self._init_workspace()
+        # Каждому воркеру по драйверу плюс по одному на поисковые потоки
+        self.driver_pool = DriverPool(self.setup_driver, size=self.thread_count + self.search_thread_count)
+        # Быстрый путь: данные канала из HTML без запуска браузера
+        self.http_fetcher = ChannelPageFetcher(pool_size=self.thread_count) if use_http else None
+        # Индекс каналов между сессиями: уже проверенные каналы (и "Not found" в пределах
+        # not_found_ttl) отсеиваются еще до очереди и не загружаются повторно.
+        # Размер индекса ограничен: давно не встречавшиеся каналы вытесняются (ChannelStore.prune)
+        self.channel_store = self._open_channel_store(not_found_ttl) if use_channel_store else None
+        # Парсер без состояния: один экземпляр на все воркеры, драйвер передается в вызов
+        self.telegram_parser = TelegramParser(http_fetcher=self.http_fetcher)
+        # Проверка найденных t.me ссылок в фоне, с кэшем по имени между сессиями
+        self.link_validator = self._open_link_validator() if validate_links else None
 
         logger.info(f"Инициализирован YouTubeSearcher с {self.thread_count} потоками")
 
@@ -47,13 +176,34 @@ class YouTubeSearcher:
         else:
             base_dir = os.path.dirname(os.path.abspath(__file__))
 
+        self.base_dir = base_dir
         self.results_dir = os.path.join(base_dir, "results")
         self.logs_dir = os.path.join(base_dir, "logs")
         os.makedirs(self.results_dir, exist_ok=True)
         os.makedirs(self.logs_dir, exist_ok=True)
 
-    def setup_driver(self):
+    def _open_channel_store(self, not_found_ttl):
+        """Открытие индекса каналов; новый индекс заполняется из прошлых результатов"""
+        try:
+            store = ChannelStore(os.path.join(self.base_dir, "channels.db"), not_found_ttl=not_found_ttl)
+            if store.is_new:
+                store.import_results(self.results_dir)
+            return store
+        except Exception as e:
+            logger.error(f"Ошибка открытия индекса каналов: {str(e)}")
+            return None
+
+    def _open_link_validator(self):
+        try:
+            cache = ValidationCache(os.path.join(self.base_dir, "telegram_links.db"))
+        except Exception as e:
+            logger.error(f"Ошибка открытия кэша проверок ссылок: {str(e)}")
+            cache = None
+        return TelegramValidator(cache=cache, max_workers=self.thread_count * 2)
+
+    def setup_driver(self, lean=None):
         """Настройка ChromeDriver с совместимостью для новых версий WDM"""
+        lean = self.lean_profile if lean is None else lean
         try:
             chrome_options = Options()
             opts = [
@@ -64,16 +214,20 @@ class YouTubeSearcher:
                 "--log-level=3",
                 "--disable-extensions",
                 "--disable-notifications",
-                "--mute-audio",
-                "--window-size=1920,1080"
+                "--mute-audio"
             ]
 
             for opt in opts:
                 chrome_options.add_argument(opt)
 
-            # Упрощенная инициализация ChromeDriverManager
+            if lean:
+                apply_lean_profile(chrome_options)
+            else:
+                chrome_options.add_argument("--window-size=1920,1080")
+
+            # Путь к драйверу определяется один раз, а не на каждую сессию
             service = Service(
-                ChromeDriverManager().install(),
+                resolve_chromedriver_path(),
                 log_path=os.path.join(self.logs_dir, "chromedriver.log")
             )
 
@@ -85,109 +239,491 @@ class YouTubeSearcher:
             driver.set_page_load_timeout(30)
             driver.implicitly_wait(5)
 
+            if lean:
+                enable_request_blocking(driver)
+
             return driver
 
         except Exception as e:
             logger.error(f"Ошибка инициализации ChromeDriver: {str(e)}")
             raise
 
+    def compare_driver_profiles(self, url=None, runs=3):
+        """Замер байт и времени загрузки страницы с облегченным профилем и без него"""
+        url = url or f"{self.base_url}/results?search_query=news&sp=EgIQAg%3D%3D"
+        return compare_profiles(self.setup_driver, url, runs=runs)
+
     def get_channel_links(self, search_query, max_retries=3):
         """Поиск ссылок на YouTube каналы по запросу"""
         for attempt in range(max_retries):
-            driver = None
             try:
                 if self.stop_event.is_set():
                     return []
 
                 logger.info(f"Поиск каналов (попытка {attempt + 1}): '{search_query}'")
-                driver = self.setup_driver()
-
-                search_url = f"https://www.youtube.com/results?search_query={search_query.replace(' ', '+')}&sp=EgIQAg%3D%3D"
-                driver.get(search_url)
-
-                WebDriverWait(driver, 20).until(
-                    EC.presence_of_element_located((By.ID, "content"))
-                )
-
-                self._scroll_to_bottom(driver)
+                with self.driver_pool.lease() as driver:
+                    self._open_search_page(driver, search_query)
+                    self._scroll_to_bottom(driver)
 
-                links = WebDriverWait(driver, 10).until(
-                    EC.presence_of_all_elements_located((By.CSS_SELECTOR, "a#video-title-link, a.yt-simple-endpoint"))
-                )
+                    WebDriverWait(driver, 10).until(
+                        EC.presence_of_all_elements_located((By.CSS_SELECTOR, SEARCH_LINK_SELECTOR))
+                    )
+                    hrefs = driver.execute_script(COLLECT_HREFS_JS, SEARCH_LINK_SELECTOR, 0) or []
 
-                channel_links = set()
-                for link in links:
-                    if self.stop_event.is_set():
-                        break
-                    try:
-                        href = link.get_attribute("href")
-                        if href and ("/channel/" in href or "/user/" in href or "/@" in href):
-                            normalized = self._normalize_channel_url(href)
-                            if normalized:
-                                channel_links.add(normalized)
-                    except Exception as e:
-                        logger.debug(f"Ошибка обработки ссылки: {str(e)}")
+                channel_links = self._extract_channel_links(hrefs)
 
                 logger.info(f"Найдено каналов: {len(channel_links)}")
                 return list(channel_links)
 
             except Exception as e:
+                Metrics.record_error(e, "search")
                 logger.error(f"Ошибка поиска (попытка {attempt + 1}): {str(e)}")
-                if attempt == max_retries - 1:
+                if attempt == max_retries - 1 or self.stop_event.is_set():
                     return []
-                time.sleep(2)
+                self.stop_event.wait(retry_delay(attempt))
                 continue
-
-            finally:
-                if driver:
-                    driver.quit()
         return []
 
-    def continuous_search(self, query):
-        """Непрерывный поиск YouTube каналов по заданному запросу"""
-        try:
-            while not self.stop_event.is_set():
-                channel_links = self.get_channel_links(query)
+    def iter_channel_links(self, search_query, max_scrolls=None):
+        """Постраничный поиск в одной сессии браузера.
 
-                with self.channels_lock:
-                    new_channels = [url for url in channel_links if url not in self.found_channels]
-                    self.found_channels.update(new_channels)
-                    self.stats["total_channels_found"] += len(new_channels)
-                    self.stats["total_queries"] += 1
-                    self.stats["last_search_time"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        Выдает пачки новых каналов после каждой прокрутки и останавливается,
+        когда очередная прокрутка не дала новых результатов.
+        """
+        max_scrolls = self.max_scroll_depth if max_scrolls is None else max_scrolls
+        seen = set()
 
-                for channel_url in new_channels:
-                    if self.stop_event.is_set():
-                        break
+        with self.driver_pool.lease() as driver:
+            logger.info(f"Поиск каналов: '{search_query}'")
+            self._open_search_page(driver, search_query)
 
-                    telegram_url = self._process_single_channel(channel_url)
-                    if self.result_callback:
-                        self.result_callback(channel_url, telegram_url)
+            offset = 0
+            for page in range(max_scrolls + 1):
+                if self.stop_event.is_set():
+                    return
+
+                # Забираем только ссылки, появившиеся после прошлой прокрутки
+                hrefs = driver.execute_script(COLLECT_HREFS_JS, SEARCH_LINK_SELECTOR, offset) or []
+                offset += len(hrefs)
+
+                new_links = [url for url in self._extract_channel_links(hrefs) if url not in seen]
+                seen.update(new_links)
+                logger.debug(f"Страница {page + 1} по '{search_query}': новых каналов {len(new_links)}")
+
+                if not new_links and page > 0:
+                    break
+                if new_links:
+                    yield new_links
+
+                if page == max_scrolls:
+                    break
+                # Прокрутка подгружает выдачу запросом к YouTube - тоже в счет лимита хоста
+                get_throttle(self.base_url).wait_turn(self.stop_event)
+                if not self._scroll_once(driver, offset):
+                    break
+
+        logger.info(f"Выдача по '{search_query}' исчерпана: найдено каналов {len(seen)}")
+
+    def _open_search_page(self, driver, search_query):
+        """Открытие страницы выдачи YouTube (фильтр: только каналы)"""
+        search_url = f"{self.base_url}/results?search_query={search_query.replace(' ', '+')}&sp=EgIQAg%3D%3D"
+        with get_throttle(search_url).request(self.stop_event) as outcome, Metrics.timer("page_load.search"), \
+                span("navigate.search", query=search_query):
+            driver.get(search_url)
+            outcome.throttled = is_throttled(None, driver.current_url)
+
+            WebDriverWait(driver, 20).until(
+                EC.presence_of_element_located((By.ID, "content"))
+            )
+
+    def _extract_channel_links(self, hrefs):
+        """Нормализованные ссылки на каналы из списка href"""
+        channel_links = set()
+        with span("normalize", hrefs=len(hrefs)):
+            for href in hrefs:
+                if "/channel/" in href or "/user/" in href or "/@" in href:
+                    normalized = self._normalize_channel_url(href)
+                    if normalized:
+                        channel_links.add(normalized)
+        return channel_links
+
+    def continuous_search(self, query):
+        """Непрерывный поиск YouTube каналов по тегам (через запятую)"""
+        queries = QueryScheduler.split_tags(query)
+        if not queries:
+            logger.warning("Нет запросов для поиска")
+            return
+
+        self.query_text = query
+        self.scheduler = QueryScheduler(queries)
+        if self.resume_state:
+            self.scheduler.restore_state(self.resume_state["scheduler"])
+        checkpointer = None
+        if self.checkpoint_path:
+            checkpointer = Checkpointer(self.get_checkpoint_state, self.checkpoint_path,
+                                        self.checkpoint_interval).start()
+
+        if self.use_async:
+            self._run_async_pipeline(queries, checkpointer)
+            return
+
+        self._start_workers()
+        searchers = []
+        try:
+            if self.pending_channels:
+                threading.Thread(target=self._requeue_pending, name="RequeuePending", daemon=True).start()
+
+            for search_id in range(min(self.search_thread_count, len(queries))):
+                searcher = threading.Thread(
+                    target=profiled(self._search_worker),
+                    name=f"SearchWorker-{search_id}",
+                    daemon=True
+                )
+                searcher.start()
+                searchers.append(searcher)
 
-                if not new_channels:
-                    time.sleep(5)
+            for searcher in searchers:
+                searcher.join()
 
         except Exception as e:
             logger.error(f"Ошибка в continuous_search: {str(e)}")
+        finally:
+            self._join_workers()
+            if checkpointer:
+                checkpointer.close()
+            self._close_stores()
+            Tracing.write_trace()
+
+    def _restore_state(self, state):
+        """Состояние из контрольной точки: найденные и недообработанные каналы, счетчики"""
+        self.found_channels = set(state["found_channels"])
+        self.pending_channels = set(state["pending"])
+        self.stats.update(state["stats"])
+        self.search_positions = dict(state.get("search_positions") or {})
+        for name, value in state.get("counters", {}).items():
+            Metrics.increment(name, value)
+        logger.info(
+            f"Продолжение поиска: найдено каналов {len(self.found_channels)}, "
+            f"в очереди {len(self.pending_channels)}"
+        )
+
+    def get_checkpoint_state(self):
+        """Снимок состояния поиска для контрольной точки"""
+        with self.channels_lock:
+            found_channels = list(self.found_channels)
+            pending = list(self.pending_channels)
+            stats = dict(self.stats)
+        return {
+            "query": self.query_text,
+            "stats": stats,
+            "found_channels": found_channels,
+            "pending": pending,
+            "scheduler": self.scheduler.export_state() if self.scheduler else [],
+            "search_positions": dict(self.search_positions),
+            "counters": Metrics.get_counters()
+        }
 
-    def _process_single_channel(self, channel_url):
-        """Обработка одного YouTube канала для поиска Telegram ссылки"""
+    def _requeue_pending(self):
+        """Каналы из контрольной точки уходят воркерам раньше новых результатов поиска"""
+        with self.channels_lock:
+            pending = list(self.pending_channels)
+        for channel_url in pending:
+            if not self._enqueue_channel(channel_url):
+                break
+
+    def _close_stores(self):
+        # Валидатор первым: его отложенные результаты еще пишутся в индекс каналов
+        if self.link_validator:
+            self.link_validator.close()
+        if self.channel_store:
+            self.channel_store.close()
+
+    def _run_async_pipeline(self, queries, checkpointer=None):
+        """Поиск и парсинг каналов через asyncio конвейер без Selenium"""
+        from AsyncEngine import AsyncPipeline
+
+        pipeline = AsyncPipeline(
+            result_callback=self._report_result,
+            channel_filter=self._register_channels,
+            validate_links=self.link_validator is not None,
+            validation_cache=self.link_validator.cache if self.link_validator else None,
+            positions=self.search_positions,
+            base_url=self.base_url,
+            max_pages=self.max_scroll_depth + 1
+        )
+        with self.channels_lock:
+            pending = list(self.pending_channels)
         try:
-            from TGPars import TelegramParser
+            pipeline.run(queries, self.stop_event, scheduler=self.scheduler, initial_channels=pending)
+        except Exception as e:
+            logger.error(f"Ошибка async конвейера: {str(e)}")
+        finally:
+            if checkpointer:
+                checkpointer.close()
+            self._close_stores()
+            Tracing.write_trace()
+
+    def _search_worker(self):
+        """Поисковый поток: берет запросы у планировщика и кладет новые каналы в очередь"""
+        while not self.stop_event.is_set():
+            query = self.scheduler.acquire(self.stop_event)
+            if query is None:
+                break
 
-            driver = self.setup_driver()
-            parser = TelegramParser(driver)
+            new_count = 0
+            try:
+                # Каналы уходят воркерам сразу после каждой прокрутки выдачи
+                for channel_links in self.iter_channel_links(query):
+                    new_channels = self._register_channels(channel_links)
+                    new_count += len(new_channels)
+
+                    for channel_url in new_channels:
+                        if not self._enqueue_channel(channel_url):
+                            break
+            except Exception as e:
+                Metrics.record_error(e, "search")
+                logger.error(f"Ошибка поиска по запросу '{query}': {str(e)}")
+            finally:
+                with self.channels_lock:
+                    self.stats["total_queries"] += 1
+                    self.stats["last_search_time"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                self.scheduler.release(query, new_count)
+
+    def _register_channels(self, channel_links):
+        """Отбор еще не виденных каналов и учет статистики поиска"""
+        with self.channels_lock:
+            new_channels = [url for url in channel_links if url not in self.found_channels]
+            self.found_channels.update(new_channels)
+            self.stats["total_channels_found"] += len(new_channels)
+
+        if self.channel_store:
+            new_channels = self.channel_store.filter_new(new_channels)
+        with self.channels_lock:
+            self.pending_channels.update(new_channels)
+        return new_channels
+
+    @staticmethod
+    def _new_worker_stats():
+        return {
+            "processed": 0,
+            "found": 0,
+            "errors": 0,
+            "busy_time": 0.0,
+            "started_at": time.monotonic()
+        }
+
+    def _start_workers(self):
+        """Запуск потоков (или процессов) обработки каналов"""
+        if self.process_count:
+            self._start_process_workers()
+            return
+
+        for worker_id in range(self.thread_count):
+            self.worker_stats[worker_id] = self._new_worker_stats()
+            worker = threading.Thread(
+                target=profiled(self._channel_worker),
+                args=(worker_id,),
+                name=f"ChannelWorker-{worker_id}",
+                daemon=True
+            )
+            worker.start()
+            self.workers.append(worker)
+
+    def _rate_share(self):
+        """Доля лимита запросов на процесс: главный процесс и каждый процесс-воркер поровну"""
+        return self.request_rate / (self.process_count + 1) if self.request_rate else 0
 
+    def _configure_rate_limit(self):
+        if self.request_rate:
+            configure_rate_limit(rate=self._rate_share(), enabled=True)
+        else:
+            configure_rate_limit(enabled=False)
+
+    def _start_process_workers(self):
+        """Каналы уходят в очередь пула процессов, результаты возвращаются в _on_process_result"""
+        from ProcessPool import ProcessWorkerPool
+
+        self.process_pool = ProcessWorkerPool(
+            self._on_process_result,
+            process_count=self.process_count,
+            thread_count=self.thread_count,
+            use_http=self.use_http,
+            lean_profile=self.lean_profile,
+            request_rate=self._rate_share()
+        )
+        for worker_id in self.process_pool.worker_ids:
+            self.worker_stats[worker_id] = self._new_worker_stats()
+        self.work_queue = self.process_pool.task_queue
+        self.process_pool.start()
+
+    def _on_process_result(self, worker_id, channel_url, telegram_url, busy_time, failed):
+        stats = self.worker_stats[worker_id]
+        stats["busy_time"] += busy_time
+        if failed:
+            stats["errors"] += 1
+            # telegram_url здесь - текст ошибки из процесса
+            logger.error(f"Ошибка обработки канала {channel_url} (воркер {worker_id}): {telegram_url}")
+            return
+        # Процессы дообрабатывают текущие каналы после остановки - их результаты тоже пишем
+        stats["processed"] += 1
+        if telegram_url:
+            stats["found"] += 1
+        self._dispatch_result(channel_url, telegram_url)
+
+    def _enqueue_channel(self, channel_url):
+        """Постановка канала в очередь с ожиданием свободного места"""
+        while not self.stop_event.is_set():
             try:
-                telegram_url = parser.parse_telegram_link(channel_url)
-                logger.info(f"Обработан канал: {channel_url} -> {telegram_url or 'Not found'}")
-                return telegram_url
+                self.work_queue.put(channel_url, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _channel_worker(self, worker_id):
+        """Воркер: берет каналы из очереди и ищет в них Telegram ссылки"""
+        stats = self.worker_stats[worker_id]
+        while not self.stop_event.is_set():
+            try:
+                channel_url = self.work_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            started = time.monotonic()
+            try:
+                telegram_url = self._process_single_channel(channel_url)
+                # Результат, полученный уже во время остановки, тоже отдаем
+                stats["processed"] += 1
+                if telegram_url:
+                    stats["found"] += 1
+                self._dispatch_result(channel_url, telegram_url)
+            except Exception as e:
+                # Сбой - не "Not found": канал не попадает в индекс и результаты
+                stats["errors"] += 1
+                Metrics.record_error(e, "channel")
+                logger.error(f"Ошибка обработки канала {channel_url} (воркер {worker_id}): {str(e)}")
             finally:
-                driver.quit()
+                stats["busy_time"] += time.monotonic() - started
+                self.work_queue.task_done()
+
+    def _dispatch_result(self, channel_url, telegram_url):
+        if telegram_url and self.link_validator:
+            # Воркер не ждет t.me: результат уйдет из потока валидатора
+            self.link_validator.submit(
+                telegram_url,
+                lambda kind: self._on_link_validated(channel_url, telegram_url, kind)
+            )
+        else:
+            self._report_result(channel_url, telegram_url)
+
+    def _on_link_validated(self, channel_url, telegram_url, kind):
+        # Проверки дорабатывают при остановке (close валидатора их ждет) - результат не теряем
+        if kind == KIND_DEAD:
+            logger.info(f"Telegram ссылка не существует: {telegram_url}")
+            telegram_url = None
+        elif kind:
+            logger.info(f"Telegram ссылка {telegram_url}: {kind}")
+        # kind=None - проверить не удалось, ссылка остается как есть
+        self._report_result(channel_url, telegram_url)
+
+    def _report_result(self, channel_url, telegram_url):
+        with self.channels_lock:
+            self.pending_channels.discard(channel_url)
+        Metrics.increment("channels_processed")
+        if telegram_url:
+            Metrics.increment("telegram_found")
+        with span("sink.result"):
+            if self.channel_store:
+                self.channel_store.record(channel_url, telegram_url)
+            if self.result_callback:
+                self.result_callback(channel_url, telegram_url)
+
+    def _join_workers(self):
+        """Ожидание завершения воркеров и вывод их статистики"""
+        for worker in self.workers:
+            worker.join(timeout=60)
+        self.workers = []
+        if self.process_pool:
+            self.process_pool.join(timeout=60)
+            self.process_pool = None
+
+        for worker_id, stats in self.get_worker_stats().items():
+            logger.info(
+                f"Воркер {worker_id}: обработано {stats['processed']}, "
+                f"найдено {stats['found']}, ошибок {stats['errors']}, "
+                f"{stats['channels_per_min']:.1f} каналов/мин, "
+                f"загрузка {stats['utilization']:.0%}"
+            )
 
-        except Exception as e:
-            logger.error(f"Ошибка обработки канала {channel_url}: {str(e)}")
-            return None
+    def get_metrics(self):
+        """Сводный снимок метрик поиска для вкладки "Метрики" и JSON экспорта"""
+        elapsed = max(time.monotonic() - self.started_at, 1e-6)
+        counters = Metrics.get_counters()
+        processed = counters.get("channels_processed", 0)
+        try:
+            queue_depth = self.work_queue.qsize()
+        except NotImplementedError:
+            queue_depth = None
+        workers = self.get_worker_stats()
+
+        return {
+            "time": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "elapsed": elapsed,
+            "channels_per_min": processed * 60 / elapsed,
+            "telegram_hit_rate": counters.get("telegram_found", 0) / processed if processed else 0.0,
+            "channels_found": self.stats["total_channels_found"],
+            "total_queries": self.stats["total_queries"],
+            "queue_depth": queue_depth,
+            "worker_utilization": (
+                sum(w["utilization"] for w in workers.values()) / len(workers) if workers else 0.0
+            ),
+            "counters": counters,
+            "histograms": Metrics.get_histograms(),
+            "workers": workers,
+            "driver_pool": self.driver_pool.get_stats(),
+            "waits": get_wait_stats(),
+            "strategies": TelegramParser.get_strategy_stats(),
+            "queries": self.scheduler.get_stats() if self.scheduler else {},
+            "rate_limits": get_throttle_stats()
+        }
+
+    def get_worker_stats(self):
+        """Статистика пропускной способности по каждому воркеру"""
+        result = {}
+        for worker_id, stats in self.worker_stats.items():
+            elapsed = max(time.monotonic() - stats["started_at"], 1e-6)
+            result[worker_id] = {
+                "processed": stats["processed"],
+                "found": stats["found"],
+                "errors": stats["errors"],
+                "channels_per_min": stats["processed"] * 60 / elapsed,
+                "utilization": min(stats["busy_time"] / elapsed, 1.0)
+            }
+        return result
+
+    def _process_single_channel(self, channel_url):
+        """Обработка одного YouTube канала для поиска Telegram ссылки.
+
+        Возвращает ссылку или None ("Not found"). Сбой (исключение, страницы не
+        загрузились) пробрасывается: такой результат не пишется ни в индекс каналов,
+        ни пользователю, канал остается среди незавершенных.
+        """
+        started = time.monotonic()
+        parsed = False
+        telegram_url = None
+        with span("channel", url=channel_url) as channel_span:
+            if self.http_fetcher:
+                parsed, telegram_url = self.telegram_parser.parse_via_http(channel_url)
+
+            if not parsed:
+                Metrics.increment("channels_via_browser")
+                with self.driver_pool.lease() as driver:
+                    telegram_url = self.telegram_parser.parse_via_browser(channel_url, driver)
+            channel_span.set("found", bool(telegram_url))
+
+        Metrics.observe("channel_process", time.monotonic() - started)
+        logger.info(f"Обработан канал: {channel_url} -> {telegram_url or 'Not found'}")
+        return telegram_url
 
     def _normalize_channel_url(self, url):
         """Нормализация URL YouTube канала"""
@@ -202,23 +738,48 @@ class YouTubeSearcher:
             logger.debug(f"Ошибка нормализации URL: {str(e)}")
             return None
 
-    def _scroll_to_bottom(self, driver):
+    def _scroll_to_bottom(self, driver, max_scrolls=3, timeout=5):
         """Прокрутка страницы до конца для загрузки всех результатов"""
         last_height = driver.execute_script("return document.documentElement.scrollHeight")
-        scroll_attempt = 0
 
-        while not self.stop_event.is_set() and scroll_attempt < 3:
+        for _ in range(max_scrolls):
+            if self.stop_event.is_set():
+                break
             driver.execute_script("window.scrollTo(0, document.documentElement.scrollHeight);")
-            time.sleep(1.5)
-            new_height = driver.execute_script("return document.documentElement.scrollHeight")
-
-            if new_height == last_height:
+            # Ждем роста высоты страницы, а не фиксированные 1.5 с
+            new_height = wait_until(
+                lambda: self._grown_height(driver, last_height),
+                timeout=timeout,
+                name="scroll_height",
+                stop_event=self.stop_event
+            )
+            if not new_height:
                 break
-
             last_height = new_height
-            scroll_attempt += 1
+
+    @staticmethod
+    def _grown_height(driver, last_height):
+        height = driver.execute_script("return document.documentElement.scrollHeight")
+        return height if height > last_height else None
+
+    def _scroll_once(self, driver, known_count, timeout=10):
+        """Одна прокрутка выдачи с ожиданием подгрузки новых элементов"""
+        driver.execute_script("window.scrollTo(0, document.documentElement.scrollHeight);")
+        return bool(wait_until(
+            lambda: driver.execute_script(COUNT_ELEMENTS_JS, SEARCH_LINK_SELECTOR) > known_count,
+            timeout=timeout,
+            poll_interval=0.2,
+            name="search_scroll",
+            stop_event=self.stop_event
+        ))
 
     def stop(self):
         """Остановка всех операций поиска"""
         self.stop_event.set()
+        process_pool = self.process_pool
+        if process_pool:
+            process_pool.stop()
+        self.driver_pool.close()
+        if self.http_fetcher:
+            self.http_fetcher.close()
         logger.info("Поиск остановлен по команде пользователя")
\ No newline at end of file
@@ -1,129 +1,318 @@
 import re
-import time
 import logging
 from urllib.parse import urlparse, parse_qs, unquote
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import WebDriverException, TimeoutException
 import threading
+from Waits import wait_until
+from Metrics import timer, record_error
+from RateLimit import get_throttle, is_throttled
+from Tracing import span
+
+# Статистика срабатываний стратегий, общая для всех экземпляров парсера
+_strategy_stats = {}
+_strategy_stats_lock = threading.Lock()
+
+
+class ChannelLoadError(Exception):
+    """Ни одна страница канала не загрузилась: результата нет, это не Not found"""
+
+
+# Ссылки и текст описания страницы за один вызов execute_script
+SNAPSHOT_JS = """
+const hrefs = Array.from(document.querySelectorAll('a[href]'), a => a.href).filter(Boolean);
+let description = '';
+for (const selector of ['#description', 'yt-formatted-string.description']) {
+    const element = document.querySelector(selector);
+    if (element) {
+        description = element.innerText;
+        break;
+    }
+}
+return {hrefs: hrefs, description: description};
+"""
+
+# Все Telegram ссылки и @упоминания за один проход по тексту.
+# Шаблон начинается с редких символов "." и "@", хост и схема проверяются уже по совпадению.
+TELEGRAM_LINK_RE = re.compile(
+    r'\.me/(?P<path>(?:joinchat/)?\+?[a-zA-Z0-9_\-]+)'
+    r'|@(?P<handle>[a-zA-Z0-9_]{5,32})\b',
+    re.IGNORECASE
+)
+# Отсев текстов без ссылок - без учета регистра, как и сам шаблон
+TELEGRAM_HINT_RE = re.compile(r'\.me/', re.IGNORECASE)
+TELEGRAM_HOST_RE = re.compile(r'(?<![\w.])(?:(?P<scheme>https?://)(?:www\.)?)?(?P<host>t|telegram)\Z', re.IGNORECASE)
+
+# Уверенность по типу совпадения: меньше - надежнее
+_RANK_TME_SCHEME = 0
+_RANK_TME = 1
+_RANK_TELEGRAM_ME_SCHEME = 2
+_RANK_TELEGRAM_ME = 3
+_RANK_HANDLE = 4
+
+
+def find_telegram_links(text):
+    """Все различные Telegram ссылки из текста, от самых надежных к менее надежным.
+
+    Явная ссылка t.me важнее telegram.me, а та важнее голого @handle.
+    """
+    # Быстрый отсев текстов, где ссылок заведомо нет
+    if not text or ('@' not in text and not TELEGRAM_HINT_RE.search(text)):
+        return []
+
+    candidates = {}
+    for position, match in enumerate(TELEGRAM_LINK_RE.finditer(text)):
+        start = match.start()
+        handle = match.group('handle')
+        if handle:
+            # Не e-mail и не часть другой ссылки
+            if start and (text[start - 1].isalnum() or text[start - 1] in '_.@/'):
+                continue
+            link = f"https://t.me/{handle}"
+            rank = _RANK_HANDLE
+        else:
+            host_match = TELEGRAM_HOST_RE.search(text, max(0, start - 20), start)
+            if not host_match:
+                continue
+            host = f"{host_match.group('host').lower()}.me"
+            link = f"https://{host}/{match.group('path')}"
+            if host == 't.me':
+                rank = _RANK_TME_SCHEME if host_match.group('scheme') else _RANK_TME
+            else:
+                rank = _RANK_TELEGRAM_ME_SCHEME if host_match.group('scheme') else _RANK_TELEGRAM_ME
+
+        # t.me/name, telegram.me/name и @name - один и тот же канал
+        key = (handle or match.group('path')).lower()
+        if key not in candidates or rank < candidates[key][0]:
+            candidates[key] = (rank, position, link)
+
+    return [link for _, _, link in sorted(candidates.values())]
+
+
+SHOW_MORE_SELECTOR = 'button#expand, paper-button#more'
+TEXT_LENGTH_JS = "return document.body ? document.body.innerText.length : 0;"
 
 
 class TelegramParser:
-    def __init__(self, driver):
+    """Поиск Telegram ссылки на YouTube канале.
+
+    Парсер не хранит состояния между вызовами: драйвер передается в каждый вызов
+    (или задается при создании для однопоточного использования), поэтому один
+    экземпляр можно безопасно использовать из многих потоков одновременно.
+    """
+
+    # Порядок стратегий поиска по загруженной странице
+    strategy_order = ("redirect", "about_section", "description")
+
+    def __init__(self, driver=None, http_fetcher=None):
         self.driver = driver
+        self.http_fetcher = http_fetcher
         self.timeout = 15
         self.logger = logging.getLogger(__name__)
-        self.lock = threading.Lock()
-
-        self.patterns = [
-            r'(https?://t\.me/[a-zA-Z0-9_\-]+)',
-            r'(https?://telegram\.me/[a-zA-Z0-9_\-]+)',
-            r'@([a-zA-Z0-9_\-]{5,32})',
-            r't\.me/([a-zA-Z0-9_\-]{5,32})',
-            r'telegram\.me/([a-zA-Z0-9_\-]{5,32})'
-        ]
-
-    def parse_telegram_link(self, channel_url):
-        with self.lock:
-            self.logger.info(f"Начинаем парсинг канала: {channel_url}")
-
-            # Вариант 1: Проверка редиректов
-            tg_link = self._find_telegram_link_via_redirect(channel_url)
-            if tg_link:
+
+        self.strategies = {
+            "redirect": self._find_telegram_link_via_redirect,
+            "about_section": self._find_telegram_link_via_about_section,
+            "description": self._find_telegram_link_via_channel_description
+        }
+
+    def parse_telegram_link(self, channel_url, driver=None):
+        self.logger.info(f"Начинаем парсинг канала: {channel_url}")
+
+        # Вариант 0: HTTP без браузера, Selenium только если разбор не удался
+        if self.http_fetcher:
+            parsed, tg_link = self.parse_via_http(channel_url)
+            if parsed:
+                if not tg_link:
+                    self.logger.warning("Telegram ссылка не найдена")
                 return tg_link
 
-            # Вариант 2: Раздел "О канале"
-            tg_link = self._find_telegram_link_via_about_section(channel_url)
+        return self.parse_via_browser(channel_url, driver)
+
+    def parse_via_browser(self, channel_url, driver=None):
+        """Поиск через браузер: каждая страница загружается один раз,
+        все стратегии работают по одному снимку"""
+        driver = driver or self.driver
+        if driver is None:
+            raise ValueError("Для парсинга через браузер нужен драйвер")
+
+        loaded = False
+        about_url = channel_url.rstrip('/') + '/about'
+        for page_url in (channel_url, about_url):
+            snapshot = self._load_snapshot(driver, page_url)
+            if snapshot is None:
+                continue
+
+            loaded = True
+            tg_link = self._run_strategies(snapshot)
             if tg_link:
                 return tg_link
 
-            # Вариант 3: Основное описание
-            tg_link = self._find_telegram_link_via_channel_description(channel_url)
+        if not loaded:
+            raise ChannelLoadError(f"Не удалось загрузить страницы канала {channel_url}")
+        self.logger.warning("Telegram ссылка не найдена")
+        return None
+
+    def parse_via_http(self, channel_url):
+        """Поиск по ytInitialData из HTML. Возвращает (удалось_разобрать, ссылка)"""
+        with timer("page_load.http"):
+            about = self.http_fetcher.fetch_about(channel_url)
+        if about is None:
+            return False, None
+
+        with span("extract.http"):
+            return True, self.find_link_in_about(about)
+
+    def find_link_in_about(self, about):
+        """Telegram ссылка из разобранных данных "О канале" (см. ChannelFetcher.extract_about_data)"""
+        tg_link = None
+        for link in about["links"]:
+            if any(x in link for x in ['t.me/', 'telegram.me/']):
+                if not link.startswith('http'):
+                    # Текст ссылки в "О канале" хранится без схемы: t.me/name
+                    link = f"https://{link}"
+                self.logger.info(f"Найдена ссылка в ytInitialData: {link}")
+                tg_link = self._normalize_link(link)
+                break
+
+        if not tg_link:
+            tg_link = self._find_link_in_text(about["description"])
             if tg_link:
-                return tg_link
+                self.logger.info(f"Найдена ссылка в описании (HTTP): {tg_link}")
 
-            self.logger.warning("Telegram ссылка не найдена")
-            return None
+        self._record_strategy("http", bool(tg_link))
+        return tg_link
 
-    def _find_telegram_link_via_redirect(self, channel_url):
+    def _load_snapshot(self, driver, page_url):
+        """Загрузка страницы и сбор ссылок и описания за один проход"""
         try:
-            self.driver.get(channel_url)
-            WebDriverWait(self.driver, self.timeout).until(
-                EC.presence_of_element_located((By.TAG_NAME, 'body'))
-            )
-
-            redirect_links = self.driver.find_elements(By.CSS_SELECTOR, 'a[href*="/redirect"]')
-            for link in redirect_links:
-                href = link.get_attribute('href')
-                if 'youtube.com/redirect' in href:
-                    parsed = urlparse(href)
-                    params = parse_qs(parsed.query)
-                    if 'q' in params:
-                        decoded = unquote(params['q'][0])
-                        if any(x in decoded for x in ['t.me/', 'telegram.me/']):
-                            self.logger.info(f"Найдена ссылка в редиректе: {decoded}")
-                            return self._normalize_link(decoded)
-        except TimeoutException:
-            self.logger.debug("Редирект-ссылки не найдены")
-        return None
+            with timer("page_load.browser"), get_throttle(page_url).request() as outcome, \
+                    span("navigate.channel", url=page_url):
+                driver.get(page_url)
+                outcome.throttled = is_throttled(200, driver.current_url)
+                WebDriverWait(driver, self.timeout).until(
+                    EC.presence_of_element_located((By.TAG_NAME, 'body'))
+                )
 
-    def _find_telegram_link_via_about_section(self, channel_url):
-        try:
-            about_url = channel_url.rstrip('/') + '/about'
-            self.driver.get(about_url)
-            WebDriverWait(self.driver, self.timeout).until(
-                EC.presence_of_element_located((By.TAG_NAME, 'body'))
-            )
-
-            self._click_show_more()
-
-            links = self.driver.find_elements(By.CSS_SELECTOR, 'a[href]')
-            for link in links:
-                href = link.get_attribute('href')
-                if href and any(x in href for x in ['t.me/', 'telegram.me/']):
-                    self.logger.info(f"Найдена ссылка в 'О канале': {href}")
-                    return self._normalize_link(href)
+            self._click_show_more(driver)
+
+            with span("extract.snapshot"):
+                snapshot = driver.execute_script(SNAPSHOT_JS) or {}
+            return {
+                "hrefs": snapshot.get("hrefs") or [],
+                "description": snapshot.get("description") or ""
+            }
+        except TimeoutException as e:
+            record_error(e, "page_load")
+            self.logger.debug(f"Таймаут загрузки страницы {page_url}: {str(e)}")
+            return None
+        except WebDriverException as e:
+            # Сессия браузера, скорее всего, умерла: пусть DriverPool.lease ее выбросит,
+            # иначе тот же драйвер сразу уйдет следующему каналу
+            record_error(e, "page_load")
+            raise
         except Exception as e:
-            self.logger.debug(f"Ошибка парсинга 'О канале': {str(e)}")
+            record_error(e, "page_load")
+            self.logger.debug(f"Ошибка загрузки страницы {page_url}: {str(e)}")
+            return None
+
+    def _run_strategies(self, snapshot):
+        """Прогон всех стратегий по снимку страницы с учетом попаданий"""
+        for name in self.strategy_order:
+            try:
+                with span(f"extract.{name}"):
+                    tg_link = self.strategies[name](snapshot)
+            except Exception as e:
+                self.logger.debug(f"Ошибка стратегии {name}: {str(e)}")
+                tg_link = None
+            self._record_strategy(name, bool(tg_link))
+            if tg_link:
+                return tg_link
         return None
 
-    def _find_telegram_link_via_channel_description(self, channel_url):
-        try:
-            self.driver.get(channel_url)
-            WebDriverWait(self.driver, self.timeout).until(
-                EC.presence_of_element_located((By.TAG_NAME, 'body'))
-            )
+    @staticmethod
+    def _record_strategy(name, hit):
+        with _strategy_stats_lock:
+            stats = _strategy_stats.setdefault(name, {"attempts": 0, "hits": 0})
+            stats["attempts"] += 1
+            if hit:
+                stats["hits"] += 1
 
-            self._click_show_more()
+    @staticmethod
+    def get_strategy_stats():
+        """Доля срабатываний каждой стратегии (для настройки strategy_order)"""
+        with _strategy_stats_lock:
+            return {
+                name: {
+                    "attempts": stats["attempts"],
+                    "hits": stats["hits"],
+                    "hit_rate": stats["hits"] / stats["attempts"] if stats["attempts"] else 0.0
+                }
+                for name, stats in _strategy_stats.items()
+            }
 
-            try:
-                description = self.driver.find_element(By.CSS_SELECTOR, '#description')
-                desc_text = description.text
-            except NoSuchElementException:
-                description = self.driver.find_element(By.CSS_SELECTOR, 'yt-formatted-string.description')
-                desc_text = description.text
-
-            for pattern in self.patterns:
-                match = re.search(pattern, desc_text)
-                if match:
-                    link = match.group(1)
-                    normalized = self._normalize_link(link)
-                    self.logger.info(f"Найдена ссылка в описании: {normalized}")
-                    return normalized
-        except Exception as e:
-            self.logger.debug(f"Ошибка парсинга описания: {str(e)}")
+    def _find_telegram_link_via_redirect(self, snapshot):
+        for href in snapshot["hrefs"]:
+            if 'youtube.com/redirect' in href:
+                parsed = urlparse(href)
+                params = parse_qs(parsed.query)
+                if 'q' in params:
+                    decoded = unquote(params['q'][0])
+                    if any(x in decoded for x in ['t.me/', 'telegram.me/']):
+                        self.logger.info(f"Найдена ссылка в редиректе: {decoded}")
+                        return self._normalize_link(decoded)
         return None
 
-    def _click_show_more(self):
+    def _find_telegram_link_via_about_section(self, snapshot):
+        for href in snapshot["hrefs"]:
+            if any(x in href for x in ['t.me/', 'telegram.me/']) and 'youtube.com/redirect' not in href:
+                self.logger.info(f"Найдена ссылка в 'О канале': {href}")
+                return self._normalize_link(href)
+        return None
+
+    def _find_telegram_link_via_channel_description(self, snapshot):
+        normalized = self._find_link_in_text(snapshot["description"])
+        if normalized:
+            self.logger.info(f"Найдена ссылка в описании: {normalized}")
+        return normalized
+
+    def _find_link_in_text(self, text):
+        links = find_telegram_links(text)
+        if len(links) > 1:
+            self.logger.info(f"В тексте несколько Telegram ссылок: {', '.join(links)}")
+        return links[0] if links else None
+
+    def _click_show_more(self, driver, timeout=2):
+        """Раскрытие описания: клик по "ещё" и ожидание, пока текст страницы вырастет"""
+        button = wait_until(
+            lambda: self._find_show_more(driver),
+            timeout=timeout,
+            name="show_more_button"
+        )
+        if not button:
+            return
+
+        before = driver.execute_script(TEXT_LENGTH_JS)
         try:
-            show_more = WebDriverWait(self.driver, 5).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, 'button#expand, paper-button#more'))
-            )
-            show_more.click()
-            time.sleep(1)
-        except TimeoutException:
-            pass
+            driver.execute_script("arguments[0].click();", button)
+        except WebDriverException as e:
+            self.logger.debug(f"Не удалось нажать 'ещё': {str(e)}")
+            return
+        wait_until(
+            lambda: driver.execute_script(TEXT_LENGTH_JS) > before,
+            timeout=1,
+            poll_interval=0.05,
+            name="show_more_expand"
+        )
+
+    @staticmethod
+    def _find_show_more(driver):
+        button = driver.execute_script("return document.querySelector(arguments[0]);", SHOW_MORE_SELECTOR)
+        if button is not None and button.is_displayed():
+            return button
+        return None
 
     def _normalize_link(self, link):
         if not link.startswith('http'):
@@ -0,0 +1,244 @@
+import os
+import re
+import sys
+import json
+import time
+import cProfile
+import logging
+import threading
+import multiprocessing
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Путь к файлу трассировки и каталог профилей; наследуются процессами-воркерами
+TRACE_ENV = "XPARSER_TRACE"
+PROFILE_ENV = "XPARSER_PROFILE"
+# Сколько последних событий держать в памяти процесса
+MAX_EVENTS = 500000
+
+_trace_path = None
+_profile_dir = None
+_events = deque(maxlen=MAX_EVENTS)
+# События процессов-воркеров (см. ProcessPool)
+_remote_events = []
+_remote_lock = threading.Lock()
+_thread_names = {}
+# Метки времени в микросекундах от эпохи: события разных процессов на одной шкале
+_clock_offset_ns = time.time_ns() - time.perf_counter_ns()
+# До Python 3.12 cProfile замеряет только свой поток. С 3.12 он работает через
+# sys.monitoring и охватывает весь процесс: второй включенный профилировщик дает ValueError
+PER_THREAD_PROFILE = sys.version_info < (3, 12)
+# Общий профилировщик процесса, пока им пользуется хотя бы один поток
+_process_profiler = None
+_process_profiler_users = 0
+_process_profiler_lock = threading.Lock()
+
+
+class _Span:
+    __slots__ = ("name", "args", "started")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def set(self, key, value):
+        """Аргумент, известный только к концу участка (результат, число элементов)"""
+        self.args[key] = value
+
+    def __enter__(self):
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        finished = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        thread = threading.current_thread()
+        _thread_names.setdefault(thread.ident, thread.name)
+        # deque.append потокобезопасен, отдельная блокировка не нужна
+        _events.append({
+            "name": self.name,
+            "cat": self.name.split(".", 1)[0],
+            "ph": "X",
+            "ts": (self.started + _clock_offset_ns) / 1000,
+            "dur": (finished - self.started) / 1000,
+            "pid": os.getpid(),
+            "tid": thread.ident,
+            "args": self.args
+        })
+        return False
+
+
+class _NullSpan:
+    """Участок при выключенной трассировке: ничего не замеряет"""
+    __slots__ = ()
+
+    def set(self, key, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name, **args):
+    """Участок трассировки: with span("navigate.channel", url=url): ...
+
+    При выключенной трассировке возвращает общий пустой объект - цена вызова
+    сводится к проверке флага.
+    """
+    if _trace_path is None:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+
+def is_enabled():
+    return _trace_path is not None
+
+
+def configure(trace_path=None, profile_dir=None):
+    """Включение трассировки и/или профилирования воркеров для этого процесса и его потомков"""
+    global _trace_path, _profile_dir
+    if trace_path:
+        _trace_path = os.path.abspath(trace_path)
+        os.environ[TRACE_ENV] = _trace_path
+    if profile_dir:
+        _profile_dir = os.path.abspath(profile_dir)
+        os.makedirs(_profile_dir, exist_ok=True)
+        os.environ[PROFILE_ENV] = _profile_dir
+
+
+def _configure_from_env():
+    configure(os.environ.get(TRACE_ENV) or None, os.environ.get(PROFILE_ENV) or None)
+
+
+def _metadata_events():
+    pid = os.getpid()
+    events = [{
+        "name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+        "args": {"name": multiprocessing.current_process().name}
+    }]
+    for tid, name in list(_thread_names.items()):
+        events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+    return events
+
+
+def export_events():
+    """События процесса с именами процесса и потоков - для передачи в координатор"""
+    return _metadata_events() + list(_events)
+
+
+def merge_events(events):
+    with _remote_lock:
+        _remote_events.extend(events)
+
+
+def write_trace(path=None):
+    """Запись всех событий в JSON формата Chrome trace (открывается в Perfetto и chrome://tracing)"""
+    path = path or _trace_path
+    if not path:
+        return None
+    with _remote_lock:
+        remote = list(_remote_events)
+    events = export_events() + remote
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        logger.info(f"Трассировка записана в {path}: {len(events)} событий")
+    except OSError as e:
+        logger.error(f"Ошибка записи трассировки: {str(e)}")
+        return None
+    return path
+
+
+def _dump_profile(profiler, name):
+    file_name = f"{re.sub(r'[^A-Za-z0-9_.-]', '_', name)}-{os.getpid()}.pstats"
+    try:
+        profiler.dump_stats(os.path.join(_profile_dir, file_name))
+    except OSError as e:
+        logger.error(f"Ошибка записи профиля {file_name}: {str(e)}")
+
+
+def _acquire_process_profiler():
+    """Подключение потока к общему профилировщику процесса; False - профилирование недоступно"""
+    global _process_profiler, _process_profiler_users
+    with _process_profiler_lock:
+        if _process_profiler is None:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError as e:
+                # Профилировщик уже включен кем-то вне Tracing (отладчик, python -m cProfile)
+                logger.warning(f"cProfile недоступен, профилирование выключено: {str(e)}")
+                return False
+            _process_profiler = profiler
+        _process_profiler_users += 1
+        return True
+
+
+def _release_process_profiler():
+    """Последний вышедший поток выключает общий профилировщик и пишет process-<pid>.pstats"""
+    global _process_profiler, _process_profiler_users
+    with _process_profiler_lock:
+        _process_profiler_users -= 1
+        if _process_profiler_users:
+            return
+        profiler, _process_profiler = _process_profiler, None
+        profiler.disable()
+        _dump_profile(profiler, "process")
+
+
+@contextmanager
+def profile_thread(name):
+    """cProfile текущего потока (воркера); при выходе - дамп pstats в каталог профилей.
+
+    На Python до 3.11 включительно у каждого воркера свой файл: <каталог>/<name>-<pid>.pstats.
+    С 3.12 (или если отдельный профилировщик включить не удалось) потоки процесса пишут
+    в один общий профиль <каталог>/process-<pid>.pstats. Сводка: python -m pstats <файл>.
+    """
+    if _profile_dir is None:
+        yield
+        return
+
+    profiler = None
+    if PER_THREAD_PROFILE:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            profiler = None
+    if profiler is None:
+        shared = _acquire_process_profiler()
+        try:
+            yield
+        finally:
+            if shared:
+                _release_process_profiler()
+        return
+
+    try:
+        yield
+    finally:
+        profiler.disable()
+        _dump_profile(profiler, name)
+
+
+def profiled(target):
+    """target потока, профилируемый под именем этого потока (см. profile_thread)"""
+    def run(*args, **kwargs):
+        with profile_thread(threading.current_thread().name):
+            return target(*args, **kwargs)
+    return run
+
+
+_configure_from_env()
@@ -0,0 +1,78 @@
+import time
+import logging
+import threading
+from collections import deque
+from Tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Длительности ожиданий по именам, общие для всех потоков
+_wait_stats = {}
+_wait_stats_lock = threading.Lock()
+_HISTORY_SIZE = 1000
+
+
+def wait_until(condition, timeout, poll_interval=0.1, name="wait", stop_event=None):
+    """Опрос условия с коротким интервалом вместо фиксированного sleep.
+
+    Возвращает первое истинное значение condition() или None по таймауту.
+    Фактическая длительность ожидания записывается в статистику под именем name.
+    """
+    started = time.monotonic()
+    deadline = started + timeout
+    result = None
+    with span(f"wait.{name}") as wait_span:
+        while True:
+            try:
+                result = condition()
+            except Exception as e:
+                logger.debug(f"Ошибка проверки условия '{name}': {str(e)}")
+                result = None
+            if result:
+                break
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            if stop_event is not None:
+                if stop_event.wait(min(poll_interval, deadline - now)):
+                    break
+            else:
+                time.sleep(min(poll_interval, deadline - now))
+        wait_span.set("timed_out", not result)
+
+    _record(name, time.monotonic() - started, timed_out=not result)
+    return result or None
+
+
+def _record(name, duration, timed_out):
+    with _wait_stats_lock:
+        stats = _wait_stats.get(name)
+        if stats is None:
+            stats = _wait_stats[name] = {
+                "count": 0,
+                "timeouts": 0,
+                "total": 0.0,
+                "history": deque(maxlen=_HISTORY_SIZE)
+            }
+        stats["count"] += 1
+        stats["total"] += duration
+        stats["history"].append(duration)
+        if timed_out:
+            stats["timeouts"] += 1
+
+
+def get_wait_stats():
+    """Сводка фактических ожиданий: среднее, p50/p95, максимум и доля таймаутов"""
+    result = {}
+    with _wait_stats_lock:
+        for name, stats in _wait_stats.items():
+            history = sorted(stats["history"])
+            result[name] = {
+                "count": stats["count"],
+                "timeouts": stats["timeouts"],
+                "avg": stats["total"] / stats["count"],
+                "p50": history[len(history) // 2],
+                "p95": history[min(int(len(history) * 0.95), len(history) - 1)],
+                "max": history[-1]
+            }
+    return result
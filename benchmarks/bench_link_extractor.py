@@ -0,0 +1,77 @@
+"""Микробенчмарк извлечения Telegram ссылок из описаний каналов.
+
+find_telegram_links делает больше прежнего цикла: собирает все ссылки, проверяет
+хост каждой и ранжирует их, поэтому медленнее его в 1,4-1,8 раза
+(combined_vs_legacy в отчете). На фоне загрузки страницы это микросекунды.
+
+Запуск из корня проекта: python -m benchmarks.bench_link_extractor
+"""
+import os
+import re
+import json
+import time
+import argparse
+
+from TGPars import find_telegram_links
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "descriptions.jsonl")
+
+# Прежняя реализация: пять отдельных regex, только первое совпадение
+LEGACY_PATTERNS = [
+    r'(https?://t\.me/[a-zA-Z0-9_\-]+)',
+    r'(https?://telegram\.me/[a-zA-Z0-9_\-]+)',
+    r'@([a-zA-Z0-9_\-]{5,32})',
+    r't\.me/([a-zA-Z0-9_\-]{5,32})',
+    r'telegram\.me/([a-zA-Z0-9_\-]{5,32})'
+]
+
+
+def legacy_find_link(text):
+    for pattern in LEGACY_PATTERNS:
+        match = re.search(pattern, text)
+        if match:
+            return match.group(1)
+    return None
+
+
+def load_corpus(path=CORPUS_PATH):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def run(func, corpus, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in corpus:
+            func(text)
+    elapsed = time.perf_counter() - started
+    return {
+        "total_time": elapsed,
+        "per_description_us": elapsed / (repeat * len(corpus)) * 1e6
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк извлечения Telegram ссылок")
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--corpus", default=CORPUS_PATH)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    legacy = run(legacy_find_link, corpus, args.repeat)
+    combined = run(find_telegram_links, corpus, args.repeat)
+    report = {
+        "descriptions": len(corpus),
+        "repeat": args.repeat,
+        "legacy": legacy,
+        "combined": combined,
+        "combined_vs_legacy": round(combined["per_description_us"] / legacy["per_description_us"], 2),
+        "legacy_found": sum(1 for text in corpus if legacy_find_link(text)),
+        "combined_found": sum(1 for text in corpus if find_telegram_links(text)),
+        "combined_links_total": sum(len(find_telegram_links(text)) for text in corpus)
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Проверка разбора блока "О канале" из HTML без браузера.
+
+Для каждой записанной страницы из fixtures/channels извлекаются описание и
+внешние ссылки (ChannelFetcher.extract_about_data), итоговая Telegram ссылка
+сверяется с fixtures/expected.json. Дополнительно - страницы, собранные из
+ytInitialData в коде: текст под "content" и служебные "url" вне блоков ссылок
+не должны попадать в ссылки.
+
+Запуск из корня проекта: python -m benchmarks.check_about
+"""
+import os
+import sys
+import json
+import glob
+import logging
+
+from ChannelFetcher import extract_about_data
+from TGPars import TelegramParser
+from benchmarks.fixture_server import FIXTURES_DIR
+
+
+def page(initial_data):
+    return f'<html><body><script>var ytInitialData = {json.dumps(initial_data, ensure_ascii=False)};</script></body></html>'
+
+
+def redirect(target):
+    return f"https://www.youtube.com/redirect?event=channel_description&q={target.replace(':', '%3A').replace('/', '%2F')}"
+
+
+# (название, HTML, ожидаемые ссылки, ожидаемая Telegram ссылка)
+INLINE_CASES = (
+    (
+        "описание в description.content",
+        page({"metadata": {"description": {"content": "Канал про крипту. Чат: t.me/crypto_chat"}},
+              "header": {"url": "/@crypto/featured", "canonicalBaseUrl": "/@crypto"}}),
+        [],
+        "https://t.me/crypto_chat"
+    ),
+    (
+        "channelExternalLinkViewModel",
+        page({"links": [{"channelExternalLinkViewModel": {
+            "title": {"content": "Telegram"},
+            "link": {"content": "t.me/view_model", "commandRuns": [{"onTap": {"innertubeCommand": {
+                "urlEndpoint": {"url": redirect("https://t.me/view_model")}}}}]},
+            "favicon": {"sources": [{"url": "https://encrypted-tbn1.gstatic.com/favicon-tbn?q=tbn"}]}
+        }}]}),
+        ["https://t.me/view_model", "t.me/view_model"],
+        "https://t.me/view_model"
+    ),
+    (
+        "primaryLinks старого channelAboutFullMetadataRenderer",
+        page({"channelAboutFullMetadataRenderer": {
+            "description": {"simpleText": "Без ссылок в тексте"},
+            "primaryLinks": [{"title": {"simpleText": "Telegram"},
+                              "navigationEndpoint": {"urlEndpoint": {"url": redirect("https://t.me/old_layout")}}}]
+        }}),
+        ["https://t.me/old_layout"],
+        "https://t.me/old_layout"
+    )
+)
+
+
+def main():
+    logging.basicConfig(level=logging.ERROR)
+    with open(os.path.join(FIXTURES_DIR, "expected.json"), encoding="utf-8") as f:
+        expected = json.load(f)
+
+    parser = TelegramParser()
+    failures = []
+
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "channels", "*.html"))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        with open(path, encoding="utf-8") as f:
+            about = extract_about_data(f.read())
+        if about is None:
+            failures.append((name, "ytInitialData не разобран"))
+            continue
+        bad_links = [link for link in about["links"] if any(c.isspace() for c in link)]
+        if bad_links:
+            failures.append((name, f"текст вместо ссылок: {bad_links}"))
+        tg_link = parser.find_link_in_about(about)
+        if tg_link != expected[f"/@{name}"]:
+            failures.append((name, f"{tg_link} вместо {expected[f'/@{name}']}"))
+
+    for name, html, links, telegram_url in INLINE_CASES:
+        about = extract_about_data(html)
+        if about["links"] != links:
+            failures.append((name, f"ссылки {about['links']} вместо {links}"))
+        tg_link = parser.find_link_in_about(about)
+        if tg_link != telegram_url:
+            failures.append((name, f"{tg_link} вместо {telegram_url}"))
+
+    print(json.dumps({"failures": failures}, ensure_ascii=False, indent=2))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Проверка ограничений индекса каналов (ChannelStore).
+
+Индекс с пределом в max_channels записей заполняется каналами с разным временем
+проверки. Устаревшие "Not found" должны удаляться, а сверх предела - вытесняться
+каналы, которые дольше всех не встречались: канал, снова отсеянный filter_new,
+остается в индексе. Отдельно проверяется открытие индекса старой схемы без seen_at.
+
+Запуск из корня проекта: python -m benchmarks.check_channel_store
+"""
+import os
+import sys
+import json
+import time
+import sqlite3
+import logging
+import tempfile
+
+import ChannelStore as channel_store_module
+from ChannelStore import ChannelStore
+
+
+def run_eviction(db_path, max_channels=100, total=300):
+    now = time.time()
+    store = ChannelStore(db_path, not_found_ttl=3600, max_channels=max_channels)
+    failures = []
+
+    # Устаревший "Not found" удаляется при первой же очистке
+    store.record("https://www.youtube.com/@stale", None, checked_at=now - 7200)
+    # Самый старый канал, но он снова встречается в выдаче
+    store.record("https://www.youtube.com/@popular", "https://t.me/popular", checked_at=now - 86400)
+    store.filter_new(["https://www.youtube.com/@popular"])
+
+    store.record_many([
+        (f"https://www.youtube.com/@channel{i}", f"https://t.me/channel{i}", now - total + i)
+        for i in range(total)
+    ])
+
+    count = store.count()
+    if count != max_channels:
+        failures.append(f"записей {count} вместо {max_channels}")
+    if store.get("https://www.youtube.com/@stale") is not None:
+        failures.append("устаревший Not found не удален")
+    if store.get("https://www.youtube.com/@popular") is None:
+        failures.append("вытеснен недавно встреченный канал")
+    if store.get(f"https://www.youtube.com/@channel{total - 1}") is None:
+        failures.append("вытеснен самый новый канал")
+    if store.get("https://www.youtube.com/@channel0") is not None:
+        failures.append("самый давний канал не вытеснен")
+    store.close()
+    return {"count": count, "max_channels": max_channels, "failures": failures}
+
+
+def run_migration(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE channels (url TEXT PRIMARY KEY, telegram_url TEXT, checked_at REAL NOT NULL)")
+    conn.execute("INSERT INTO channels VALUES (?, ?, ?)",
+                 ("https://www.youtube.com/@old", "https://t.me/old", time.time()))
+    conn.commit()
+    conn.close()
+
+    store = ChannelStore(db_path)
+    failures = []
+    if store.filter_new(["https://www.youtube.com/@old"]):
+        failures.append("канал из старого индекса не отсеян")
+    store.record("https://www.youtube.com/@new", None)
+    if store.count() != 2:
+        failures.append(f"записей {store.count()} вместо 2")
+    store.close()
+    return {"failures": failures}
+
+
+def main():
+    logging.basicConfig(level=logging.ERROR)
+    # Очистка должна запускаться сама по числу записанных каналов, без явного prune()
+    channel_store_module.PRUNE_EVERY = 50
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        report = {
+            "eviction": run_eviction(os.path.join(tmp_dir, "channels.db")),
+            "migration": run_migration(os.path.join(tmp_dir, "old_channels.db"))
+        }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 1 if any(part["failures"] for part in report.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""Проверка TelegramValidator на локальных страницах предпросмотра t.me.
+
+Многие потоки одновременно проверяют одни и те же ссылки: типы сверяются с
+fixtures/telegram/expected.json, а каждое имя должно загружаться ровно один раз
+(повторы обслуживает кэш). Второй проход идет через новый валидатор поверх того
+же файла кэша и не должен делать ни одного запроса. Третий проход - фоновые
+проверки через submit() на пуле меньше числа проверок: все колбэки должны
+отработать, а close() - вернуться.
+
+Запуск из корня проекта: python -m benchmarks.check_validator
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from LinkValidator import TelegramValidator, ValidationCache, handle_from_url
+from benchmarks.fixture_server import FixtureServer, FIXTURES_DIR
+
+
+def load_expected():
+    with open(os.path.join(FIXTURES_DIR, "telegram", "expected.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def run_pass(base_url, db_path, expected, workers, checks):
+    validator = TelegramValidator(cache=ValidationCache(db_path), max_workers=workers,
+                                  base_url=base_url + "/tg")
+    urls = list(expected)
+    jobs = [urls[i % len(urls)] for i in range(checks)]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda url: (url, validator.validate(url)), jobs))
+    elapsed = time.perf_counter() - started
+    validator.close()
+
+    mismatches = [(url, kind) for url, kind in results if kind != expected[url]]
+    return {
+        "checks": checks,
+        "elapsed": elapsed,
+        "checks_per_sec": checks / elapsed,
+        "fetched": validator.stats["checked"],
+        "cache_hits": validator.stats["cache_hits"],
+        "errors": validator.stats["errors"],
+        "mismatches": len(mismatches),
+        "first_mismatch": mismatches[0] if mismatches else None
+    }
+
+
+def run_submit_pass(base_url, db_path, expected, workers, checks, timeout=30.0):
+    """Проверки через submit(): задачи и загрузки делят один пул валидатора"""
+    validator = TelegramValidator(cache=ValidationCache(db_path), max_workers=workers,
+                                  base_url=base_url + "/tg")
+    urls = list(expected)
+    jobs = [urls[i % len(urls)] for i in range(checks)]
+    results = []
+    done = threading.Semaphore(0)
+
+    def on_validated(url, kind):
+        results.append((url, kind))
+        done.release()
+
+    started = time.perf_counter()
+    for url in jobs:
+        validator.submit(url, lambda kind, url=url: on_validated(url, kind))
+    deadline = started + timeout
+    completed = sum(1 for _ in jobs if done.acquire(timeout=max(deadline - time.perf_counter(), 0)))
+    elapsed = time.perf_counter() - started
+
+    # Зависший пул не дал бы close() вернуться - закрываем в отдельном потоке с таймаутом
+    closer = threading.Thread(target=validator.close, daemon=True)
+    closer.start()
+    closer.join(timeout=timeout)
+
+    mismatches = [(url, kind) for url, kind in results if kind != expected[url]]
+    return {
+        "workers": workers,
+        "checks": checks,
+        "completed": completed,
+        "elapsed": elapsed,
+        "closed": not closer.is_alive(),
+        "fetched": validator.stats["checked"],
+        "mismatches": len(mismatches),
+        "first_mismatch": mismatches[0] if mismatches else None
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Проверка валидатора Telegram ссылок")
+    arg_parser.add_argument("--workers", type=int, default=16)
+    arg_parser.add_argument("--checks", type=int, default=500)
+    arg_parser.add_argument("--latency", type=float, default=0.05,
+                            help="искусственная задержка ответа сервера, с")
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    expected = load_expected()
+    handles = {handle_from_url(url) for url in expected}
+
+    with tempfile.TemporaryDirectory() as tmp_dir, FixtureServer(latency=args.latency) as server:
+        db_path = os.path.join(tmp_dir, "telegram_links.db")
+        cold = run_pass(server.base_url, db_path, expected, args.workers, args.checks)
+        warm = run_pass(server.base_url, db_path, expected, args.workers, args.checks)
+        submit = run_submit_pass(server.base_url, os.path.join(tmp_dir, "submit.db"), expected,
+                                 workers=2, checks=max(len(expected) * 2, 8))
+
+    report = {"handles": len(handles), "cold": cold, "warm": warm, "submit": submit}
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    failed = (cold["mismatches"] or warm["mismatches"]
+              or cold["fetched"] != len(handles) or warm["fetched"] != 0
+              or submit["mismatches"] or submit["completed"] != submit["checks"] or not submit["closed"])
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
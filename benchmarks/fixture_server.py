@@ -0,0 +1,105 @@
+"""Локальный HTTP сервер с записанными страницами YouTube для офлайн тестов и бенчмарков"""
+import os
+import sys
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        path = self._resolve(urlparse(self.path).path)
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if path is None or not os.path.isfile(path):
+            self._send(404, b"Not found")
+            return
+
+        with open(path, "rb") as f:
+            self._send(200, f.read())
+
+    def do_POST(self):
+        """Продолжение выдачи: POST /youtubei/v1/search -> fixtures/search/continuation.json"""
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if urlparse(self.path).path != "/youtubei/v1/search":
+            self._send(404, b"Not found")
+            return
+
+        with open(os.path.join(self.server.fixtures_dir, "search", "continuation.json"), "rb") as f:
+            self._send(200, f.read(), content_type="application/json")
+
+    def _resolve(self, url_path):
+        """/@name и /@name/about -> fixtures/channels/name.html, /results -> fixtures/search/results.html,
+        /tg/name -> fixtures/telegram/name.html (страница предпросмотра t.me)"""
+        parts = [p for p in url_path.split("/") if p]
+        if parts and parts[0].startswith("@"):
+            return os.path.join(self.server.fixtures_dir, "channels", f"{parts[0][1:]}.html")
+        if len(parts) == 2 and parts[0] == "tg":
+            return os.path.join(self.server.fixtures_dir, "telegram", f"{parts[1]}.html")
+        if parts == ["results"]:
+            return os.path.join(self.server.fixtures_dir, "search", "results.html")
+        return None
+
+    def _send(self, status, body, content_type="text/html; charset=utf-8"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Клиент закрыл соединение при остановке бенчмарка - это не ошибка
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+class FixtureServer:
+    """Фоновый HTTP сервер на 127.0.0.1 со страницами из benchmarks/fixtures.
+
+    latency - искусственная задержка ответа в секундах, имитирующая сеть.
+    """
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR, latency=0.0, port=0):
+        self._server = _QuietHTTPServer(("127.0.0.1", port), _FixtureHandler)
+        self._server.fixtures_dir = fixtures_dir
+        self._server.latency = latency
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,252 @@
+"""Офлайн бенчмарк всего пути обработки на записанных страницах YouTube.
+
+Локальный сервер (fixture_server) отдает выдачу поиска и страницы каналов из
+benchmarks/fixtures. YouTubeSearcher смотрит на этот сервер через base_url;
+каждый раунд проходит get_channel_links (браузер), _normalize_channel_url и
+TelegramParser.parse_telegram_link для всех найденных каналов, результаты
+сверяются с fixtures/expected.json.
+
+В отчете: каналов в секунду, перцентили задержек по этапам, пиковый RSS этого
+процесса и дочерних (chromedriver/Chrome), число запущенных драйверов. Отчет
+можно сохранить (--output) и сравнить с отчетом прошлой версии (--compare).
+
+Если Chrome/chromedriver недоступен, этап поиска пропускается (причина - в
+отчете), а каналы берутся из fixtures/expected.json; разбор идет через HTTP.
+
+Запуск из корня проекта: python -m benchmarks.replay --output replay.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import platform
+import resource
+import subprocess
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import Metrics
+from Search import YouTubeSearcher
+from TGPars import ChannelLoadError
+from benchmarks.fixture_server import FixtureServer, FIXTURES_DIR
+
+# Ссылки из выдачи в том виде, в каком их отдает браузер, - вход для замера нормализации
+NORMALIZE_SAMPLES = (
+    "/@invest_redirect",
+    "/@crypto_desc?si=abc123",
+    "/channel/UCinvest_redirect/videos",
+    "/channel/UCcrypto_desc/featured?view=0",
+    "/user/travel_tme",
+    "/watch?v=dQw4w9WgXcQ"
+)
+NORMALIZE_BATCH = 1000
+
+
+def load_expected():
+    with open(os.path.join(FIXTURES_DIR, "expected.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def percentiles(samples):
+    """Сводка по длительностям в секундах"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+
+    def pick(q):
+        return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "p50": pick(0.50),
+        "p90": pick(0.90),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": ordered[-1]
+    }
+
+
+def peak_rss_mb():
+    """Пиковый RSS процесса и завершенных дочерних процессов, МБ (ru_maxrss на Linux - в КБ)"""
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+        "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def check_browser(searcher):
+    """None, если драйвер запускается, иначе причина, по которой поиск будет пропущен"""
+    try:
+        with searcher.driver_pool.lease(timeout=120):
+            return None
+    except Exception as e:
+        return f"{type(e).__name__}: {str(e).strip().splitlines()[0] if str(e).strip() else ''}"
+
+
+def bench_normalize(searcher, base_url, batches):
+    """Задержка одного вызова _normalize_channel_url (среднее по пачке из NORMALIZE_BATCH вызовов)"""
+    urls = [base_url + sample for sample in NORMALIZE_SAMPLES]
+    samples = []
+    for _ in range(batches):
+        started = time.perf_counter()
+        for i in range(NORMALIZE_BATCH):
+            searcher._normalize_channel_url(urls[i % len(urls)])
+        samples.append((time.perf_counter() - started) / NORMALIZE_BATCH)
+    return samples
+
+
+def run_rounds(searcher, base_url, expected, rounds, workers, use_browser):
+    search_times = []
+    parse_times = []
+    results = []
+
+    def parse(channel_url):
+        started = time.perf_counter()
+        if use_browser and not searcher.use_http:
+            with searcher.driver_pool.lease() as driver:
+                link = searcher.telegram_parser.parse_telegram_link(channel_url, driver)
+        else:
+            # HTTP путь; без драйвера неразобранная страница считается расхождением
+            try:
+                link = searcher.telegram_parser.parse_telegram_link(channel_url)
+            except (ValueError, ChannelLoadError):
+                link = None
+        parse_times.append(time.perf_counter() - started)
+        return channel_url, link
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for _ in range(rounds):
+            if use_browser:
+                search_started = time.perf_counter()
+                channels = searcher.get_channel_links("fixture query")
+                search_times.append(time.perf_counter() - search_started)
+            else:
+                channels = [base_url + path for path in expected]
+            results.extend(pool.map(parse, channels))
+    elapsed = time.perf_counter() - started
+
+    mismatches = [
+        (url, link) for url, link in results
+        if link != expected.get(url[len(base_url):], "missing")
+    ]
+    return {
+        "elapsed": elapsed,
+        "channels": len(results),
+        "channels_per_sec": len(results) / elapsed if elapsed else 0.0,
+        "mismatches": len(mismatches),
+        "first_mismatch": mismatches[0] if mismatches else None
+    }, search_times, parse_times
+
+
+def compare(report, baseline):
+    """Изменение ключевых показателей относительно отчета прошлой версии, в долях"""
+    def ratio(new, old):
+        return (new - old) / old if new is not None and old else None
+
+    result = {
+        "baseline_revision": baseline.get("revision"),
+        "channels_per_sec": ratio(report["channels_per_sec"], baseline.get("channels_per_sec")),
+        "peak_rss_self_mb": ratio(report["peak_rss_mb"]["self"], baseline.get("peak_rss_mb", {}).get("self"))
+    }
+    for stage, summary in report["stages"].items():
+        old = (baseline.get("stages") or {}).get(stage)
+        if summary and old:
+            result[f"{stage}.p95"] = ratio(summary["p95"], old["p95"])
+    return result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Офлайн бенчмарк поиска и разбора каналов")
+    arg_parser.add_argument("--rounds", type=int, default=20, help="проходов поиск -> разбор")
+    arg_parser.add_argument("--workers", type=int, default=3, help="потоков разбора каналов")
+    arg_parser.add_argument("--latency", type=float, default=0.02,
+                            help="искусственная задержка ответа сервера, с")
+    arg_parser.add_argument("--no-http", action="store_true", help="разбирать каналы только через браузер")
+    arg_parser.add_argument("--normalize-batches", type=int, default=200)
+    arg_parser.add_argument("--output", help="сохранить отчет в JSON файл")
+    arg_parser.add_argument("--compare", help="отчет прошлой версии для сравнения")
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    # Без сети chromedriver не скачивается: только XPARSER_CHROMEDRIVER, рядом с программой или PATH
+    os.environ.setdefault("XPARSER_OFFLINE", "1")
+    expected = load_expected()
+
+    with FixtureServer(latency=args.latency) as server:
+        searcher = YouTubeSearcher(
+            thread_count=args.workers,
+            search_thread_count=1,
+            use_http=not args.no_http,
+            use_channel_store=False,
+            request_rate=0,
+            base_url=server.base_url
+        )
+        try:
+            browser_error = check_browser(searcher)
+            if browser_error and args.no_http:
+                print(f"Браузер недоступен, а --no-http требует его: {browser_error}", file=sys.stderr)
+                return 2
+
+            summary, search_times, parse_times = run_rounds(
+                searcher, server.base_url, expected, args.rounds, args.workers, browser_error is None
+            )
+            normalize_times = bench_normalize(searcher, server.base_url, args.normalize_batches)
+            driver_stats = searcher.driver_pool.get_stats()
+            histograms = Metrics.get_histograms()
+        finally:
+            searcher.stop()
+            searcher._close_stores()
+    # До запуска git: его процесс тоже попал бы в RUSAGE_CHILDREN
+    rss = peak_rss_mb()
+
+    report = {
+        "time": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": vars(args),
+        "browser": browser_error is None,
+        "search_skipped": browser_error,
+        **summary,
+        "stages": {
+            "search": percentiles(search_times),
+            "normalize": percentiles(normalize_times),
+            "parse": percentiles(parse_times)
+        },
+        "internal_histograms": histograms,
+        "peak_rss_mb": rss,
+        "drivers": {
+            "created": driver_stats["drivers_created"],
+            "recycled": driver_stats["drivers_recycled"],
+            "crashed": driver_stats["drivers_crashed"],
+            "pool_size": searcher.driver_pool.size
+        }
+    }
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            report["comparison"] = compare(report, json.load(f))
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+    return 1 if summary["mismatches"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
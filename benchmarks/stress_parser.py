@@ -0,0 +1,202 @@
+"""Нагрузочная проверка потокобезопасности TelegramParser.
+
+Один общий экземпляр парсера разбирает записанные страницы каналов из многих
+потоков одновременно; результаты сверяются с fixtures/expected.json.
+
+Браузерные раунды гоняют parse_via_browser с отдельным драйвером-заглушкой на
+каждый поток: ссылки в редиректе, в "О канале", в описании (видно только после
+"ещё") и без ссылки. Кроме ссылок сверяются приросты статистики стратегий.
+
+Запуск из корня проекта: python -m benchmarks.stress_parser
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+from ChannelFetcher import ChannelPageFetcher
+from TGPars import TelegramParser, SNAPSHOT_JS, TEXT_LENGTH_JS
+from RateLimit import configure as configure_rate_limit
+from benchmarks.fixture_server import FixtureServer, FIXTURES_DIR
+
+
+def load_expected():
+    with open(os.path.join(FIXTURES_DIR, "expected.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def run_round(parser, base_url, expected, workers, parses):
+    paths = list(expected)
+    jobs = [paths[i % len(paths)] for i in range(parses)]
+
+    def job(path):
+        parsed, link = parser.parse_via_http(base_url + path)
+        return path, parsed, link
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(job, jobs))
+    elapsed = time.perf_counter() - started
+
+    mismatches = [
+        (path, link) for path, parsed, link in results
+        if not parsed or link != expected[path]
+    ]
+    return {
+        "workers": workers,
+        "parses": parses,
+        "elapsed": elapsed,
+        "parses_per_sec": parses / elapsed,
+        "mismatches": len(mismatches),
+        "first_mismatch": mismatches[0] if mismatches else None
+    }
+
+
+# Вид страницы-заглушки -> стратегия, которая должна сработать (None - ссылки нет)
+STUB_KINDS = {
+    "redirect": "redirect",
+    "direct": "about_section",
+    "description": "description",
+    "none": None
+}
+
+
+class _StubButton:
+    def is_displayed(self):
+        return True
+
+
+class StubDriver:
+    """Драйвер-заглушка: страница канала по виду из имени, описание раскрывается кликом"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.current_url = None
+        self.expanded = False
+
+    def get(self, url):
+        time.sleep(self.latency)
+        self.current_url = url
+        self.expanded = False
+
+    def find_element(self, by, value):
+        return object()
+
+    def execute_script(self, script, *args):
+        name = self.current_url.rstrip("/").split("/@", 1)[1].split("/", 1)[0]
+        kind = name.split("-", 1)[0]
+        link = f"https://t.me/{name.replace('-', '_')}"
+        if script == SNAPSHOT_JS:
+            hrefs = ["https://www.youtube.com/about"]
+            if kind == "redirect":
+                hrefs.append(f"https://www.youtube.com/redirect?event=channel_description&q={quote(link, safe='')}")
+            elif kind == "direct":
+                hrefs.append(link)
+            description = f"Чат канала: {link}" if kind == "description" and self.expanded else ""
+            return {"hrefs": hrefs, "description": description}
+        if script == TEXT_LENGTH_JS:
+            return 200 if self.expanded else 100
+        if script.startswith("return document.querySelector"):
+            return None if self.expanded else _StubButton()
+        if script == "arguments[0].click();":
+            self.expanded = True
+            return None
+        raise AssertionError(f"Неизвестный скрипт: {script[:40]}")
+
+
+def run_browser_round(parser, workers, parses, latency):
+    kinds = list(STUB_KINDS)
+    jobs = [f"https://www.youtube.com/@{kinds[i % len(kinds)]}-{i}" for i in range(parses)]
+    drivers = threading.local()
+
+    def job(channel_url):
+        if not hasattr(drivers, "driver"):
+            drivers.driver = StubDriver(latency)
+        return channel_url, parser.parse_via_browser(channel_url, drivers.driver)
+
+    before = TelegramParser.get_strategy_stats()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(job, jobs))
+    elapsed = time.perf_counter() - started
+    after = TelegramParser.get_strategy_stats()
+
+    mismatches = []
+    expected_stats = {name: {"attempts": 0, "hits": 0} for name in TelegramParser.strategy_order}
+    for channel_url, link in results:
+        name = channel_url.split("/@", 1)[1]
+        hit = STUB_KINDS[name.split("-", 1)[0]]
+        expected_link = f"https://t.me/{name.replace('-', '_')}" if hit else None
+        if link != expected_link:
+            mismatches.append((channel_url, link))
+        # Без ссылки стратегии проходят по обеим страницам: канал и /about
+        for strategy in TelegramParser.strategy_order * (1 if hit else 2):
+            expected_stats[strategy]["attempts"] += 1
+            if strategy == hit:
+                expected_stats[strategy]["hits"] += 1
+                break
+
+    stats_mismatches = {}
+    for name, expected_counts in expected_stats.items():
+        counts = {
+            key: after.get(name, {}).get(key, 0) - before.get(name, {}).get(key, 0)
+            for key in ("attempts", "hits")
+        }
+        if counts != expected_counts:
+            stats_mismatches[name] = {"got": counts, "expected": expected_counts}
+
+    return {
+        "workers": workers,
+        "parses": parses,
+        "elapsed": elapsed,
+        "parses_per_sec": parses / elapsed,
+        "mismatches": len(mismatches) + len(stats_mismatches),
+        "first_mismatch": mismatches[0] if mismatches else None,
+        "stats_mismatches": stats_mismatches or None
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Стресс-тест TelegramParser на локальных страницах")
+    arg_parser.add_argument("--workers", default="1,2,4,8,16")
+    arg_parser.add_argument("--parses", type=int, default=400)
+    arg_parser.add_argument("--latency", type=float, default=0.02,
+                            help="искусственная задержка ответа сервера, с")
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    # Меряем парсер, а не ограничитель запросов
+    configure_rate_limit(enabled=False)
+    expected = load_expected()
+    worker_counts = [int(w) for w in args.workers.split(",")]
+
+    rounds = []
+    with FixtureServer(latency=args.latency) as server:
+        fetcher = ChannelPageFetcher(pool_size=max(worker_counts))
+        parser = TelegramParser(http_fetcher=fetcher)
+        for workers in worker_counts:
+            rounds.append(run_round(parser, server.base_url, expected, workers, args.parses))
+        fetcher.close()
+    browser_parser = TelegramParser()
+    browser_rounds = [
+        run_browser_round(browser_parser, workers, args.parses, args.latency)
+        for workers in worker_counts
+    ]
+
+    baseline = rounds[0]["parses_per_sec"] / rounds[0]["workers"]
+    for r in rounds:
+        r["scaling_efficiency"] = r["parses_per_sec"] / (baseline * r["workers"])
+
+    print(json.dumps({"rounds": rounds, "browser_rounds": browser_rounds,
+                      "strategy_stats": TelegramParser.get_strategy_stats()},
+                     ensure_ascii=False, indent=2))
+    return 1 if any(r["mismatches"] for r in rounds + browser_rounds) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""Консольный режим XPARSER без Tk: для серверов без дисплея.
+
+Примеры:
+    python -m cli "крипто, инвестиции" --threads 5
+    python -m cli --queries-file tags.txt --processes 4 --stats-interval 30
+    python -m cli "новости" --duration 120 --trace logs/trace.json --profile logs/profiles
+"""
+import os
+import sys
+import json
+import time
+import signal
+import logging
+import argparse
+import threading
+import multiprocessing
+from datetime import datetime
+
+from ResultWriter import ResultWriter
+from Metrics import MetricsExporter
+from Checkpoint import load_checkpoint, DEFAULT_CHECKPOINT_INTERVAL
+from RateLimit import DEFAULT_RATE
+import Tracing
+
+logger = logging.getLogger("cli")
+
+# Те же параметры записи, что и в GUI
+RESULT_FLUSH_INTERVAL = 2.0
+RESULT_BATCH_SIZE = 50
+EXCEL_REBUILD_INTERVAL = 300.0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m cli",
+        description="Поиск Telegram ссылок YouTube каналов без графического интерфейса"
+    )
+    parser.add_argument("queries", nargs="*", help="теги для поиска (можно через запятую)")
+    parser.add_argument("-f", "--queries-file", help="файл с тегами: по одному на строку, # - комментарий")
+    parser.add_argument("-t", "--threads", type=int, default=3, help="воркеров обработки каналов (1-10)")
+    parser.add_argument("--search-threads", type=int, default=2, help="потоков поиска по выдаче (1-10)")
+    parser.add_argument("-p", "--processes", type=int, default=0,
+                        help="процессов-воркеров по --threads потоков в каждом; 0 - без процессов")
+    parser.add_argument("--scroll-depth", type=int,
+                        help="сколько раз прокручивать выдачу одного тега за сессию (по умолчанию 50); "
+                             "в --async - число страниц продолжения")
+    parser.add_argument("-o", "--output", default="results", help="каталог для журнала и xlsx")
+    parser.add_argument("--excel-interval", type=float, default=EXCEL_REBUILD_INTERVAL,
+                        help="как часто пересобирать xlsx, с (0 - только в конце)")
+    parser.add_argument("--include-not-found", action="store_true",
+                        help="писать в результаты и каналы без Telegram ссылки")
+    parser.add_argument("--stats-interval", type=float, default=60.0,
+                        help="как часто печатать статистику в stdout, с (0 - не печатать)")
+    parser.add_argument("--metrics-file", help="периодически выгружать полный снимок метрик в этот JSON файл")
+    parser.add_argument("--metrics-interval", type=float, default=10.0, help="период выгрузки метрик, с")
+    parser.add_argument("--checkpoint", help="файл контрольной точки (по умолчанию <output>/checkpoint.json.gz)")
+    parser.add_argument("--checkpoint-interval", type=float, default=DEFAULT_CHECKPOINT_INTERVAL,
+                        help="как часто сохранять контрольную точку, с")
+    parser.add_argument("--no-checkpoint", action="store_true", help="не сохранять контрольную точку")
+    parser.add_argument("--resume", action="store_true",
+                        help="продолжить поиск с контрольной точки (теги берутся из нее, если не заданы)")
+    parser.add_argument("--duration", type=float, default=0.0,
+                        help="остановиться через указанное число секунд (0 - до Ctrl+C/SIGTERM)")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="asyncio конвейер без браузера")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help="запросов в секунду на хост на все процессы (0 - без ограничений)")
+    parser.add_argument("--validate-links", action="store_true", help="проверять найденные t.me ссылки")
+    parser.add_argument("--no-http", action="store_true", help="парсить каналы только через браузер")
+    parser.add_argument("--no-channel-store", action="store_true",
+                        help="не пропускать каналы, проверенные в прошлых запусках")
+    parser.add_argument("--full-profile", action="store_true",
+                        help="обычный профиль Chrome вместо облегченного")
+    parser.add_argument("--offline", action="store_true",
+                        help="не скачивать chromedriver (то же, что XPARSER_OFFLINE=1)")
+    parser.add_argument("--trace", help=f"записать трассировку участков в Chrome trace JSON (или {Tracing.TRACE_ENV})")
+    parser.add_argument("--profile", help=f"каталог для cProfile дампов каждого воркера, с Python 3.12 - "
+                             f"одного на процесс (или {Tracing.PROFILE_ENV})")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"])
+    parser.add_argument("--log-file", help="дополнительно писать лог в файл")
+    return parser.parse_args(argv)
+
+
+def load_queries(args):
+    """Теги из аргументов и файла одной строкой через запятую, как в поле ввода GUI"""
+    tags = list(args.queries)
+    if args.queries_file:
+        with open(args.queries_file, encoding="utf-8") as f:
+            tags.extend(line.strip() for line in f if line.strip() and not line.lstrip().startswith("#"))
+    return ", ".join(tags)
+
+
+def setup_logging(level, log_file=None):
+    # Логи в stderr, stdout остается под статистику
+    handlers = [logging.StreamHandler(sys.stderr)]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, encoding="utf-8"))
+    logging.basicConfig(
+        level=getattr(logging, level),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=handlers
+    )
+
+
+class HeadlessRunner:
+    """Запуск YouTubeSearcher с записью результатов и периодической статистикой"""
+
+    def __init__(self, searcher, writer, include_not_found=False):
+        self.searcher = searcher
+        self.writer = writer
+        self.include_not_found = include_not_found
+        self.started_at = time.monotonic()
+        self.results = 0
+        self.found = 0
+        self._lock = threading.Lock()
+
+    def on_result(self, youtube_url, telegram_url):
+        with self._lock:
+            self.results += 1
+            if telegram_url:
+                self.found += 1
+        if telegram_url or self.include_not_found:
+            self.writer.write({
+                'youtube_url': youtube_url,
+                'telegram_url': telegram_url or "Not found"
+            })
+
+    def get_stats(self):
+        elapsed = max(time.monotonic() - self.started_at, 1e-6)
+        try:
+            queue_depth = self.searcher.work_queue.qsize()
+        except NotImplementedError:
+            queue_depth = None
+        workers = self.searcher.get_worker_stats().values()
+        return {
+            "time": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "elapsed": round(elapsed, 1),
+            "channels_found": self.searcher.stats["total_channels_found"],
+            "processed": self.results,
+            "telegram_found": self.found,
+            "channels_per_min": round(self.results * 60 / elapsed, 1),
+            "queue_depth": queue_depth,
+            "worker_errors": sum(w["errors"] for w in workers),
+            "avg_utilization": round(sum(w["utilization"] for w in workers) / len(workers), 2) if workers else None,
+            "rows_written": self.writer.rows_written,
+            "drivers": self.searcher.driver_pool.get_stats()["active_drivers"]
+        }
+
+    def print_stats(self):
+        print(json.dumps(self.get_stats(), ensure_ascii=False), flush=True)
+
+    def run(self, query, stats_interval, duration):
+        search_thread = threading.Thread(
+            target=self.searcher.continuous_search,
+            args=(query,),
+            name="Search",
+            daemon=True
+        )
+        search_thread.start()
+
+        deadline = time.monotonic() + duration if duration else None
+        next_stats = time.monotonic() + stats_interval if stats_interval else None
+        while search_thread.is_alive():
+            search_thread.join(timeout=0.5)
+            now = time.monotonic()
+            if deadline and now >= deadline and not self.searcher.stop_event.is_set():
+                logger.info("Время работы истекло, остановка")
+                self.searcher.stop()
+            if next_stats and now >= next_stats:
+                self.print_stats()
+                next_stats = now + stats_interval
+
+        self.print_stats()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup_logging(args.log_level, args.log_file)
+
+    if args.offline:
+        os.environ["XPARSER_OFFLINE"] = "1"
+    # До запуска процессов-воркеров: они включают трассировку по переменным окружения
+    Tracing.configure(trace_path=args.trace, profile_dir=args.profile)
+
+    checkpoint_path = None if args.no_checkpoint else (
+        args.checkpoint or os.path.join(args.output, "checkpoint.json.gz")
+    )
+    resume_state = None
+    if args.resume:
+        resume_state = load_checkpoint(args.checkpoint or os.path.join(args.output, "checkpoint.json.gz"))
+        if resume_state is None:
+            logger.error("Контрольная точка для продолжения не найдена")
+            return 2
+
+    query = load_queries(args) or (resume_state or {}).get("query")
+    if not query:
+        logger.error("Не заданы теги для поиска: передайте их аргументами или через --queries-file")
+        return 2
+
+    # Импорт после настройки окружения: Search читает XPARSER_OFFLINE при запуске драйвера
+    from Search import YouTubeSearcher, DEFAULT_SCROLL_DEPTH
+
+    runner = None
+    searcher = YouTubeSearcher(
+        result_callback=lambda y, t: runner.on_result(y, t),
+        thread_count=args.threads,
+        search_thread_count=args.search_threads,
+        process_count=args.processes,
+        use_http=not args.no_http,
+        use_channel_store=not args.no_channel_store,
+        lean_profile=not args.full_profile,
+        use_async=args.use_async,
+        validate_links=args.validate_links,
+        checkpoint_path=checkpoint_path,
+        checkpoint_interval=args.checkpoint_interval,
+        resume_state=resume_state,
+        request_rate=args.rate,
+        max_scroll_depth=DEFAULT_SCROLL_DEPTH if args.scroll_depth is None else args.scroll_depth
+    )
+    # Запись стартует после поиска: поток записи не демон и не даст процессу
+    # завершиться, если конструктор поиска упадет
+    writer = ResultWriter(
+        results_dir=args.output,
+        flush_interval=RESULT_FLUSH_INTERVAL,
+        batch_size=RESULT_BATCH_SIZE,
+        excel_interval=args.excel_interval
+    ).start()
+    runner = HeadlessRunner(searcher, writer, include_not_found=args.include_not_found)
+    exporter = None
+    if args.metrics_file:
+        exporter = MetricsExporter(searcher.get_metrics, args.metrics_file, interval=args.metrics_interval).start()
+
+    def handle_signal(signum, frame):
+        logger.info(f"Получен сигнал {signum}, остановка поиска")
+        searcher.stop()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, handle_signal)
+
+    logger.info(f"Запущен поиск: '{query}'")
+    try:
+        runner.run(query, args.stats_interval, args.duration)
+    finally:
+        if not searcher.stop_event.is_set():
+            searcher.stop()
+        if exporter:
+            exporter.close()
+        writer.close()
+    return 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -2,19 +2,41 @@ import tkinter as tk
 from tkinter import ttk, font as tkfont, messagebox, scrolledtext
 from Search import YouTubeSearcher
 from Update import Updater
+from ResultWriter import ResultWriter
+from Metrics import MetricsExporter
+from Checkpoint import load_checkpoint
 from datetime import datetime
 import os
 import logging
 import sys
 import threading
 import queue
-from openpyxl import Workbook, load_workbook
+from collections import deque
+import multiprocessing
 
 
 # Конфигурация приложения
 APP_NAME = "XPARSER"
 APP_VERSION = "0.94"
 
+# Запись результатов: как часто сбрасывать журнал и пересобирать xlsx
+RESULT_FLUSH_INTERVAL = 2.0
+RESULT_BATCH_SIZE = 50
+EXCEL_REBUILD_INTERVAL = 300.0
+
+# Вывод в текстовые поля: сколько строк держать и как часто дописывать
+LOG_MAX_LINES = 2000
+RESULTS_MAX_LINES = 3000
+TEXT_FLUSH_INTERVAL_MS = 250
+TEXT_MAX_PENDING = 1000
+
+# Метрики: обновление вкладки и выгрузка JSON снимка
+METRICS_REFRESH_MS = 2000
+METRICS_EXPORT_INTERVAL = 10.0
+
+# Контрольная точка поиска для кнопки "Продолжить"
+CHECKPOINT_PATH = os.path.join("results", "checkpoint.json.gz")
+
 # Настройка глобального логгера
 def setup_logging():
     os.makedirs("logs", exist_ok=True)
@@ -32,20 +54,83 @@ def setup_logging():
     return log_file
 
 # Инициализация логгера и сохранение пути к лог-файлу
-log_file = setup_logging()
+# (процессы-воркеры ProcessPool пишут логи через координатор, свой файл им не нужен)
+log_file = setup_logging() if multiprocessing.parent_process() is None else None
 logger = logging.getLogger(__name__)
 
+class BufferedTextView:
+    """Вывод в текстовое поле из любых потоков пачками в потоке Tk.
+
+    append() только кладет строку в очередь. Раз в flush_interval_ms очередь
+    дописывается в виджет одной вставкой, старые строки сверх max_lines
+    обрезаются. Если строки приходят быстрее, чем выводятся, в очереди остаются
+    последние max_pending, а о пропущенных выводится одна строка.
+    """
+
+    def __init__(self, root, text_widget, max_lines, flush_interval_ms=TEXT_FLUSH_INTERVAL_MS,
+                 max_pending=TEXT_MAX_PENDING):
+        self.root = root
+        self.text_widget = text_widget
+        self.max_lines = max_lines
+        self.flush_interval_ms = flush_interval_ms
+        self._pending = deque(maxlen=max_pending)
+        self._lock = threading.Lock()
+        self._dropped = 0
+        self.root.after(self.flush_interval_ms, self._flush)
+
+    def append(self, text):
+        with self._lock:
+            if len(self._pending) == self._pending.maxlen:
+                self._dropped += 1
+            self._pending.append(text)
+
+    def clear(self):
+        """Очистка поля и очереди (только из потока Tk)"""
+        with self._lock:
+            self._pending.clear()
+            self._dropped = 0
+        self.text_widget.config(state="normal")
+        self.text_widget.delete("1.0", "end")
+        self.text_widget.config(state="disabled")
+
+    def _flush(self):
+        with self._lock:
+            lines = list(self._pending)
+            self._pending.clear()
+            dropped, self._dropped = self._dropped, 0
+
+        try:
+            if lines:
+                if dropped:
+                    lines.insert(0, f"... пропущено строк: {dropped}")
+                self._write(lines)
+        finally:
+            self.root.after(self.flush_interval_ms, self._flush)
+
+    def _write(self, lines):
+        widget = self.text_widget
+        # Автопрокрутка, только если пользователь не отмотал поле вверх
+        at_bottom = widget.yview()[1] >= 0.999
+        widget.config(state="normal")
+        widget.insert("end", "\n".join(lines) + "\n")
+        excess = int(widget.index("end-1c").split(".")[0]) - 1 - self.max_lines
+        if excess > 0:
+            widget.delete("1.0", f"{excess + 1}.0")
+        widget.config(state="disabled")
+        if at_bottom:
+            widget.see("end")
+
+
 class TextHandler(logging.Handler):
-    def __init__(self, text_widget):
+    def __init__(self, text_view):
         super().__init__()
-        self.text_widget = text_widget
+        self.text_view = text_view
 
     def emit(self, record):
-        msg = self.format(record)
-        self.text_widget.config(state="normal")
-        self.text_widget.insert("end", msg + "\n")
-        self.text_widget.see("end")
-        self.text_widget.config(state="disabled")
+        try:
+            self.text_view.append(self.format(record))
+        except Exception:
+            self.handleError(record)
 
 class XParserApp:
     def __init__(self, root):
@@ -62,8 +147,10 @@ class XParserApp:
         self.search_thread = None
         self.searcher = None
         self.result_queue = queue.Queue()
-        self.excel_path = None
+        self.result_writer = None
+        self.metrics_exporter = None
         self.thread_count = 3
+        self.process_count = 0  # 0 - каналы обрабатываются потоками этого процесса
         self.found_count = 0  # Счетчик найденных Telegram ссылок
 
         # Инициализация интерфейса
@@ -71,13 +158,15 @@ class XParserApp:
         self._center_window()
         self._setup_logging()
         self.root.after(100, self._process_result_queue)
+        self.root.after(METRICS_REFRESH_MS, self._refresh_metrics)
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
 
         logger.info(f"{APP_NAME} v{APP_VERSION} запущен")
 
     def _setup_logging(self):
         """Настройка вывода логов в интерфейс"""
         if hasattr(self, 'log_text'):
-            text_handler = TextHandler(self.log_text)
+            text_handler = TextHandler(self.log_view)
             text_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
             logger.addHandler(text_handler)
             logging.getLogger('WDM').addHandler(text_handler)
@@ -124,6 +213,18 @@ class XParserApp:
         )
         self.stop_btn.pack(side="left", padx=5)
 
+        self.resume_btn = tk.Button(
+            left_control_frame,
+            text="ПРОДОЛЖИТЬ",
+            font=self.button_font,
+            width=14,
+            height=2,
+            bg="#444444",
+            fg="white",
+            command=self.resume_search
+        )
+        self.resume_btn.pack(side="left", padx=5)
+
         # Счетчик найденных ссылок
         self.counter_label = ttk.Label(
             left_control_frame,
@@ -150,6 +251,20 @@ class XParserApp:
         self.thread_spinbox.delete(0, "end")
         self.thread_spinbox.insert(0, "3")
 
+        ttk.Label(right_control_frame, text="Процессы:", font=self.main_font).pack(side="left")
+
+        self.process_spinbox = tk.Spinbox(
+            right_control_frame,
+            from_=0,
+            to=32,
+            width=3,
+            font=self.main_font,
+            command=self._update_process_count
+        )
+        self.process_spinbox.pack(side="left", padx=5)
+        self.process_spinbox.delete(0, "end")
+        self.process_spinbox.insert(0, "0")
+
         # Текстовые поля
         self.results_text = scrolledtext.ScrolledText(
             search_frame,
@@ -159,6 +274,7 @@ class XParserApp:
         )
         self.results_text.pack(fill="both", expand=True, padx=10, pady=5)
         self.results_text.config(state="disabled")
+        self.results_view = BufferedTextView(self.root, self.results_text, RESULTS_MAX_LINES)
 
         # Текстовое поле для логов
         self.log_text = scrolledtext.ScrolledText(
@@ -169,6 +285,20 @@ class XParserApp:
         )
         self.log_text.pack(fill="both", expand=True, padx=10, pady=5)
         self.log_text.config(state="disabled")
+        self.log_view = BufferedTextView(self.root, self.log_text, LOG_MAX_LINES)
+
+        # Вкладка метрик
+        metrics_frame = ttk.Frame(self.tab_control)
+        self.tab_control.add(metrics_frame, text="Метрики")
+
+        self.metrics_text = scrolledtext.ScrolledText(
+            metrics_frame,
+            wrap=tk.NONE,
+            font=tkfont.Font(family="Courier", size=10)
+        )
+        self.metrics_text.pack(fill="both", expand=True, padx=10, pady=10)
+        self.metrics_text.insert("end", "Метрики появятся после запуска поиска")
+        self.metrics_text.config(state="disabled")
 
         # Вкладка конфигурации
         config_frame = ttk.Frame(self.tab_control)
@@ -247,80 +377,53 @@ class XParserApp:
         y = (self.root.winfo_screenheight() // 2) - (height // 2)
         self.root.geometry(f'{width}x{height}+{x}+{y}')
 
-    def _process_result_queue(self):
-        """Обработка очереди результатов"""
-        try:
-            while True:
-                result = self.result_queue.get_nowait()
-                self._display_result(result)
-                self._save_to_excel(result)
-        except queue.Empty:
-            pass
-        finally:
-            self.root.after(100, self._process_result_queue)
-
     def _display_result(self, result):
         """Отображение результата в интерфейсе"""
-        self.results_text.config(state="normal")
-        self.results_text.insert("end", f"[{datetime.now().strftime('%H:%M:%S')}] YouTube: {result['youtube_url']}\n")
-        self.results_text.insert("end", f"Telegram: {result['telegram_url']}\n\n")
-        self.results_text.see("end")
-        self.results_text.config(state="disabled")
+        self.results_view.append(
+            f"[{datetime.now().strftime('%H:%M:%S')}] YouTube: {result['youtube_url']}\n"
+            f"Telegram: {result['telegram_url']}\n"
+        )
 
-    def _save_to_excel(self, result):
-        """Сохранение результатов в Excel файл"""
+    def _refresh_metrics(self):
+        """Перерисовка вкладки метрик по снимку текущего поиска"""
         try:
-            os.makedirs("results", exist_ok=True)
-
-            # Если файл еще не создан
-            if self.excel_path is None:
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                self.excel_path = f"results/results_{timestamp}.xlsx"
-
-                # Создаем новую книгу Excel
-                wb = Workbook()
-                ws = wb.active
-                ws.title = "Результаты"
-
-                # Заголовки
-                ws.append(['YouTube URL', 'Telegram URL', 'Дата', 'Время'])
-
-                # Данные
-                ws.append([
-                    result['youtube_url'],
-                    result['telegram_url'],
-                    datetime.now().strftime('%Y-%m-%d'),
-                    datetime.now().strftime('%H:%M:%S')
-                ])
-
-                # Сохраняем файл
-                wb.save(self.excel_path)
-                logger.info(f"Создан новый Excel файл: {self.excel_path}")
-            else:
-                # Если файл уже существует, загружаем его и дописываем данные
-                try:
-                    wb = load_workbook(self.excel_path)
-                    ws = wb.active
-
-                    # Добавляем новую строку
-                    ws.append([
-                        result['youtube_url'],
-                        result['telegram_url'],
-                        datetime.now().strftime('%Y-%m-%d'),
-                        datetime.now().strftime('%H:%M:%S')
-                    ])
-
-                    # Сохраняем изменения
-                    wb.save(self.excel_path)
-                except Exception as e:
-                    logger.error(f"Ошибка при дописывании в Excel: {str(e)}")
-                    # Если не удалось дописать, создаем новый файл
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                    self.excel_path = f"results/results_{timestamp}.xlsx"
-                    self._save_to_excel(result)  # Рекурсивный вызов для создания нового файла
-
+            if self.searcher and self.search_running:
+                text = self._format_metrics(self.searcher.get_metrics())
+                self.metrics_text.config(state="normal")
+                self.metrics_text.delete("1.0", "end")
+                self.metrics_text.insert("end", text)
+                self.metrics_text.config(state="disabled")
         except Exception as e:
-            logger.error(f"Ошибка сохранения в Excel: {str(e)}")
+            logger.debug(f"Ошибка обновления метрик: {str(e)}")
+        finally:
+            self.root.after(METRICS_REFRESH_MS, self._refresh_metrics)
+
+    @staticmethod
+    def _format_metrics(m):
+        lines = [
+            f"Время работы:        {m['elapsed'] / 60:.1f} мин",
+            f"Каналов в минуту:    {m['channels_per_min']:.1f}",
+            f"Доля с Telegram:     {m['telegram_hit_rate']:.0%}",
+            f"Найдено каналов:     {m['channels_found']}",
+            f"Очередь каналов:     {m['queue_depth'] if m['queue_depth'] is not None else '-'}",
+            f"Загрузка воркеров:   {m['worker_utilization']:.0%}",
+            f"Драйверов активно:   {m['driver_pool']['active_drivers']}",
+            "",
+            f"{'Длительности, с':<24}{'count':>8}{'avg':>9}{'p50':>9}{'p95':>9}{'max':>9}"
+        ]
+        for name, h in sorted({**m["histograms"], **{f"wait.{k}": v for k, v in m["waits"].items()}}.items()):
+            lines.append(
+                f"{name:<24}{h['count']:>8}{h['avg']:>9.2f}{h['p50']:>9.2f}{h['p95']:>9.2f}{h['max']:>9.2f}"
+            )
+
+        lines += ["", "Стратегии (попытки / попадания):"]
+        for name, s in m["strategies"].items():
+            lines.append(f"  {name:<22}{s['attempts']:>8}{s['hits']:>8}  {s['hit_rate']:.0%}")
+
+        errors = {k: v for k, v in m["counters"].items() if k.startswith("errors.")}
+        lines += ["", "Ошибки по типам:"]
+        lines += [f"  {name[len('errors.'):]:<40}{count:>8}" for name, count in sorted(errors.items())] or ["  нет"]
+        return "\n".join(lines)
 
     def _update_thread_count(self):
         """Обновление количества потоков"""
@@ -334,24 +437,59 @@ class XParserApp:
             self.thread_spinbox.insert(0, "3")
             self.thread_count = 3
 
+    def _update_process_count(self):
+        """Обновление количества процессов-воркеров"""
+        try:
+            self.process_count = int(self.process_spinbox.get())
+            if not 0 <= self.process_count <= 32:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Ошибка", "Введите число от 0 до 32")
+            self.process_spinbox.delete(0, "end")
+            self.process_spinbox.insert(0, "0")
+            self.process_count = 0
+
     def _process_result_queue(self):
         """Обработка очереди результатов"""
+        try:
+            self._drain_result_queue()
+        finally:
+            self.root.after(100, self._process_result_queue)
+
+    def _drain_result_queue(self):
+        """Все накопившиеся результаты: в окно и в журнал"""
+        found_before = self.found_count
         try:
             while True:
                 result = self.result_queue.get_nowait()
                 self._display_result(result)
                 if result['telegram_url'] != "Not found":
-                    self._save_to_excel(result)
+                    if self.result_writer:
+                        self.result_writer.write(result)
                     self.found_count += 1
-                    self.counter_label.config(text=f"Найдено: {self.found_count}")
         except queue.Empty:
             pass
         finally:
-            self.root.after(100, self._process_result_queue)
+            if self.found_count != found_before:
+                self.counter_label.config(text=f"Найдено: {self.found_count}")
+
+
+    def resume_search(self):
+        """Продолжение прерванного поиска с последней контрольной точки"""
+        if self.search_running:
+            return
 
+        state = load_checkpoint(CHECKPOINT_PATH)
+        if not state or not state.get("query"):
+            messagebox.showinfo("Продолжить", "Нет сохраненного поиска для продолжения")
+            return
+
+        self.tags_entry.delete("1.0", "end")
+        self.tags_entry.insert("1.0", state["query"])
+        self.start_search(resume_state=state)
 
-    def start_search(self):
-        """Запуск поиска"""
+    def start_search(self, resume_state=None):
+        """Запуск поиска (или продолжение с контрольной точки resume_state)"""
         if self.search_running:
             return
 
@@ -362,24 +500,40 @@ class XParserApp:
 
         self.search_running = True
         self.search_btn.config(state="disabled")
+        self.resume_btn.config(state="disabled")
         self.stop_btn.config(state="normal")
-        self.results_text.config(state="normal")
-        self.results_text.delete(1.0, "end")
-        self.results_text.config(state="disabled")
-        self.excel_path = None  # Сброс для создания нового файла
-        self.found_count = 0    # Сброс счетчика
-        self.counter_label.config(text="Найдено: 0")
+        self.results_view.clear()
+        # Новый журнал и xlsx на каждый запуск поиска
+        self.result_writer = ResultWriter(
+            results_dir="results",
+            flush_interval=RESULT_FLUSH_INTERVAL,
+            batch_size=RESULT_BATCH_SIZE,
+            excel_interval=EXCEL_REBUILD_INTERVAL
+        ).start()
+        # Сброс счетчика (при продолжении - найденное до остановки)
+        self.found_count = resume_state["counters"].get("telegram_found", 0) if resume_state else 0
+        self.counter_label.config(text=f"Найдено: {self.found_count}")
 
         self._update_thread_count()
+        self._update_process_count()
 
         self.searcher = YouTubeSearcher(
             result_callback=lambda y, t: self.result_queue.put({
                 'youtube_url': y,
                 'telegram_url': t or "Not found"
             }),
-            thread_count=self.thread_count
+            thread_count=self.thread_count,
+            process_count=self.process_count,
+            checkpoint_path=CHECKPOINT_PATH,
+            resume_state=resume_state
         )
 
+        self.metrics_exporter = MetricsExporter(
+            self.searcher.get_metrics,
+            os.path.join("logs", f"metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"),
+            interval=METRICS_EXPORT_INTERVAL
+        ).start()
+
         self.search_thread = threading.Thread(
             target=self.searcher.continuous_search,
             args=(query,),
@@ -395,14 +549,42 @@ class XParserApp:
             return
 
         self.search_running = False
-        self.search_btn.config(state="normal")
         self.stop_btn.config(state="disabled")
 
         if self.searcher:
             self.searcher.stop()
 
+        if self.metrics_exporter:
+            self.metrics_exporter.close(wait=False)
+
+        # Воркеры и проверка ссылок еще могут отдать результаты: журнал закрывается,
+        # когда поток поиска завершится, кнопки запуска до этого недоступны
+        self._wait_search_finished()
         logger.info("Поиск остановлен")
 
+    def _wait_search_finished(self):
+        if self.search_thread and self.search_thread.is_alive():
+            self.root.after(200, self._wait_search_finished)
+            return
+        self._finish_results()
+        self.search_btn.config(state="normal")
+        self.resume_btn.config(state="normal")
+
+    def _finish_results(self, wait=False):
+        """Последние результаты в журнал и закрытие записи (итоговый xlsx - в потоке записи)"""
+        self._drain_result_queue()
+        if self.result_writer:
+            self.result_writer.close(wait=wait)
+            self.result_writer = None
+
+    def _on_close(self):
+        """Закрытие окна: дожидаемся завершения поиска и записи результатов"""
+        self.stop_search()
+        if self.search_thread:
+            self.search_thread.join(timeout=60)
+        self._finish_results(wait=True)
+        self.root.destroy()
+
     def save_config(self):
         """Сохранение настроек"""
         try:
@@ -422,6 +604,8 @@ class XParserApp:
         self.updater.show_update_dialog(self.root)
 
 if __name__ == "__main__":
+    # Запуск процессов-воркеров из собранного exe
+    multiprocessing.freeze_support()
     try:
         root = tk.Tk()
         app = XParserApp(root)